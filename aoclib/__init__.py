@@ -0,0 +1,3 @@
+"""
+Shared tooling for the Advent of Code 2022 Python solutions
+"""
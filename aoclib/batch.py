@@ -0,0 +1,189 @@
+"""
+Solve many input files in one run across a process pool.
+
+Jobs come either from a directory, where every file named day<N>*.txt is
+solved by every registered part of day N, or from a manifest with one JSON
+object per line:
+
+    {"day": 11, "part": "2", "file": "inputs/a.txt", "params": {"num_rounds": 500}}
+
+Without "part" the file is solved by every registered part of the day and
+"params" defaults to the solver defaults. Relative
+files are resolved against the manifest's directory. One JSON result line is
+written to stdout per job as soon as it completes.
+
+With --cache-dir results are stored in an on-disk cache keyed on the input
+bytes, day, part and parameters, and repeated inputs are answered from it
+without parsing.
+
+Usage:
+    python -m aoclib.batch inputs/
+    python -m aoclib.batch --manifest jobs.jsonl --workers 8 > results.jsonl
+    python -m aoclib.batch inputs/ --cache-dir ~/.cache/aoc2022
+"""
+import argparse as ap
+import concurrent.futures
+import json
+import os
+import re
+import sys
+import time
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+from aoclib.cache import DEFAULT_MAX_BYTES, ResultCache, cached_run
+from aoclib.solvers import SOLVERS, find_solver
+
+DAY_FILE_RE = re.compile(r"^day(\d+)(\D.*)?\.txt$")
+
+# result cache of the current worker process, set up by init_worker
+WORKER_CACHE: Optional[ResultCache] = None
+
+
+class Job(NamedTuple):
+    """
+    One input file to solve with one day/part entry point
+    """
+
+    day: int
+    part: str
+    file: str
+    params: Dict[str, Any]
+
+
+def day_jobs(
+    day: int, fname: str, params: Optional[Dict[str, Any]] = None
+) -> List[Job]:
+    """
+    Build one job per registered part of a day
+    Params:
+        day: puzzle day number
+        fname: input file
+        params: solver parameter overrides
+    Returns: list of jobs. An unknown day still gets a job so the missing
+    solver is reported in the results.
+    """
+    parts = [solver.part for solver in SOLVERS if solver.day == day] or ["both"]
+    return [Job(day, part, fname, params or {}) for part in parts]
+
+
+def directory_jobs(directory: str) -> Iterator[Job]:
+    """
+    Build jobs for every day<N>*.txt file found under a directory
+    Params:
+        directory: directory to search
+    Returns: iterator over jobs, one per file and registered part
+    """
+    for dirpath, _dirnames, filenames in os.walk(directory):
+        for filename in sorted(filenames):
+            match = DAY_FILE_RE.match(filename)
+            if not match:
+                continue
+            yield from day_jobs(int(match.group(1)), os.path.join(dirpath, filename))
+
+
+def manifest_jobs(manifest: str) -> Iterator[Job]:
+    """
+    Read jobs from a JSON lines manifest
+    Params:
+        manifest: manifest filename
+    Returns: iterator over jobs
+    """
+    base = os.path.dirname(os.path.abspath(manifest))
+    with open(manifest, "r", encoding="utf-8") as infile:
+        for line in infile:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            day = int(entry["day"])
+            fname = os.path.join(base, entry["file"])
+            params = entry.get("params", {})
+            if "part" in entry:
+                yield Job(day, str(entry["part"]), fname, params)
+            else:
+                yield from day_jobs(day, fname, params)
+
+
+def init_worker(cache_dir: Optional[str], cache_bytes: int) -> None:
+    """
+    Open the result cache once in each worker process
+    Params:
+        cache_dir: cache directory, or None to run without a cache
+        cache_bytes: size bound of the cache
+    """
+    global WORKER_CACHE  # pylint: disable=global-statement
+    WORKER_CACHE = ResultCache(cache_dir, cache_bytes) if cache_dir else None
+
+
+def solve_job(job: Job) -> Dict[str, Any]:
+    """
+    Solve one job inside a worker process
+    Params:
+        job: the job to run
+    Returns: the job description with either its result or the error raised
+    """
+    report: Dict[str, Any] = job._asdict()
+    start = time.perf_counter()
+    try:
+        solver = find_solver(job.day, job.part)
+        with open(job.file, "rb") as infile:
+            data = infile.read()
+        report["result"], report["cached"] = cached_run(
+            WORKER_CACHE, solver, data, job.params
+        )
+    except Exception as err:  # pylint: disable=broad-except
+        report["error"] = f"{type(err).__name__}: {err}"
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+def run_batch(
+    jobs: List[Job],
+    workers: int,
+    cache_dir: Optional[str] = None,
+    cache_bytes: int = DEFAULT_MAX_BYTES,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Fan jobs out across a process pool
+    Params:
+        jobs: jobs to run
+        workers: number of worker processes
+        cache_dir: result cache directory, or None to run without a cache
+        cache_bytes: size bound of the result cache
+    Returns: iterator yielding each job report in completion order
+    """
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(cache_dir, cache_bytes),
+    ) as pool:
+        futures = [pool.submit(solve_job, job) for job in jobs]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+
+
+def main(args: ap.Namespace) -> int:
+    """
+    Run every job and stream the results as JSON lines
+    """
+    if args.manifest:
+        jobs = list(manifest_jobs(args.manifest))
+    else:
+        jobs = list(directory_jobs(args.directory))
+
+    failures = 0
+    for report in run_batch(jobs, args.workers, args.cache_dir, args.cache_bytes):
+        failures += "error" in report
+        sys.stdout.write(json.dumps(report) + "\n")
+        sys.stdout.flush()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = ap.ArgumentParser()
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("directory", nargs="?")
+    source.add_argument("--manifest")
+    parser.add_argument("--workers", default=os.cpu_count() or 1, type=int)
+    parser.add_argument("--cache-dir", help="reuse results stored in this directory")
+    parser.add_argument("--cache-bytes", default=DEFAULT_MAX_BYTES, type=int)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,312 @@
+"""
+Benchmark harness for every registered solver.
+
+Times the parse and solve phases of each solver separately over its
+checked-in inputs, repeats every case to take a median and writes a JSON
+or CSV report. A parse that returns a generator is read to the end inside
+the parse timer, so streaming solvers still report a real split. A
+previous JSON report can be passed as a baseline to flag regressions
+between commits.
+
+With --sizes the checked-in inputs are replaced by generated inputs of
+each size, so runtime can be charted against input size.
+
+Usage:
+    python -m aoclib.bench --repeat 5 --output bench.json
+    python -m aoclib.bench --days 7 14 --output bench.csv
+    python -m aoclib.bench --baseline old.json --output new.json
+    python -m aoclib.bench --days 7 --sizes 1000 10000 100000 --output scale.csv
+"""
+import argparse as ap
+import collections.abc
+import csv
+import datetime
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from aoclib.generators import GENERATORS, generate, parse_knobs, solver_params
+from aoclib.solvers import REPO_ROOT, SOLVERS, Solver, load
+
+
+class Timing(NamedTuple):
+    """
+    Timing summary of one solver on one input
+    """
+
+    solver: str
+    input: str
+    params: Dict[str, Any]
+    repeat: int
+    parse_median: float
+    parse_min: float
+    solve_median: float
+    solve_min: float
+    result: Dict[str, Any]
+
+    @property
+    def key(self) -> str:
+        """
+        Identifier used to match cases between reports
+        """
+        return f"{self.solver}:{self.input}"
+
+
+def drain(parsed: Any) -> Any:
+    """
+    Read a lazy parse result to the end, turning iterators into lists,
+    including iterators inside a returned tuple such as day5's moves
+    """
+    if isinstance(parsed, collections.abc.Iterator):
+        return list(parsed)
+    if type(parsed) is tuple:  # pylint: disable=unidiomatic-typecheck
+        return tuple(drain(item) for item in parsed)
+    return parsed
+
+
+def time_case(
+    solver: Solver, label: str, lines: List[str], params: Dict[str, Any], repeat: int
+) -> Timing:
+    """
+    Run one solver on one input repeat times. Logging is left unconfigured
+    so diagnostics are neither formatted nor written during the measurement.
+    Params:
+        solver: entry point to run
+        label: name of the input used in the report
+        lines: input lines
+        params: keyword parameters passed to solve
+        repeat: number of timed runs
+    Returns: median and best parse/solve time in seconds
+    """
+    module, solve = load(solver)
+    parse_times: List[float] = []
+    solve_times: List[float] = []
+    result: Dict[str, Any] = {}
+    for _i in range(repeat):
+        start = time.perf_counter()
+        parsed = drain(module.parse(iter(lines)))
+        parsed_at = time.perf_counter()
+        result = solve(parsed, **params)
+        solved_at = time.perf_counter()
+        parse_times.append(parsed_at - start)
+        solve_times.append(solved_at - parsed_at)
+
+    return Timing(
+        solver.name,
+        label,
+        params,
+        repeat,
+        statistics.median(parse_times),
+        min(parse_times),
+        statistics.median(solve_times),
+        min(solve_times),
+        result,
+    )
+
+
+def git_revision() -> Optional[str]:
+    """
+    Return the commit the working tree is on, if it can be determined
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def select_solvers(
+    days: Optional[List[int]], parts: Optional[List[str]]
+) -> List[Solver]:
+    """
+    Filter the registry down to the requested days and parts
+    """
+    return [
+        solver
+        for solver in SOLVERS
+        if (not days or solver.day in days) and (not parts or solver.part in parts)
+    ]
+
+
+def compare(
+    timings: List[Timing], baseline: Dict[str, Any], threshold: float, min_delta: float
+) -> List[str]:
+    """
+    Find cases that got slower than a previous report
+    Params:
+        timings: current timings
+        baseline: previously written JSON report
+        threshold: allowed slowdown ratio, e.g. 1.2 for 20%
+        min_delta: slowdowns smaller than this many seconds are treated as noise
+    Returns: description of every regression found
+    """
+    previous = {
+        f"{case['solver']}:{case['input']}": case for case in baseline["cases"]
+    }
+    regressions: List[str] = []
+    for timing in timings:
+        old = previous.get(timing.key)
+        if old is None:
+            continue
+        if old["result"] != timing.result:
+            regressions.append(f"{timing.key} result changed")
+        for phase in ("parse", "solve"):
+            old_median = old[f"{phase}_median"]
+            new_median = getattr(timing, f"{phase}_median")
+            if new_median - old_median < min_delta:
+                continue
+            if old_median > 0 and new_median / old_median > threshold:
+                regressions.append(
+                    f"{timing.key} {phase} {old_median:.6f}s -> {new_median:.6f}s"
+                )
+    return regressions
+
+
+def write_json(timings: List[Timing], outfile: TextIO) -> None:
+    """
+    Write the report as JSON, along with enough context to compare runs
+    """
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "cases": [timing._asdict() for timing in timings],
+    }
+    json.dump(report, outfile, indent=2)
+    outfile.write("\n")
+
+
+def write_csv(timings: List[Timing], outfile: TextIO) -> None:
+    """
+    Write the report as CSV, one row per solver and input
+    """
+    writer = csv.writer(outfile)
+    writer.writerow(
+        [
+            "solver",
+            "input",
+            "repeat",
+            "parse_median",
+            "parse_min",
+            "solve_median",
+            "solve_min",
+        ]
+    )
+    for timing in timings:
+        writer.writerow(
+            [
+                timing.solver,
+                timing.input,
+                timing.repeat,
+                f"{timing.parse_median:.9f}",
+                f"{timing.parse_min:.9f}",
+                f"{timing.solve_median:.9f}",
+                f"{timing.solve_min:.9f}",
+            ]
+        )
+
+
+def checked_in_cases(
+    solver: Solver, examples_only: bool
+) -> Iterator[Tuple[str, List[str], Dict[str, Any]]]:
+    """
+    Yield the label, lines and parameters of each checked-in input
+    """
+    for fname, overrides in solver.inputs.items():
+        if examples_only and "example" not in fname:
+            continue
+        with open(os.path.join(REPO_ROOT, fname), "r", encoding="utf-8") as infile:
+            lines = infile.readlines()
+        yield fname, lines, {**solver.params, **overrides}
+
+
+def generated_cases(
+    solver: Solver, sizes: List[int], seed: int, knobs: Dict[str, int]
+) -> Iterator[Tuple[str, List[str], Dict[str, Any]]]:
+    """
+    Yield the label, lines and parameters of a generated input of each size
+    """
+    if solver.day not in GENERATORS:
+        return
+    scale = GENERATORS[solver.day].scale
+    # knobs apply only to the days whose generator accepts them
+    accepted = inspect.signature(GENERATORS[solver.day].generate).parameters
+    knobs = {name: value for name, value in knobs.items() if name in accepted}
+    for size in sizes:
+        size_knobs = {**knobs, scale: size}
+        lines = [line + "\n" for line in generate(solver.day, seed, **size_knobs)]
+        label = "generated:" + ",".join(f"{k}={v}" for k, v in size_knobs.items())
+        yield label, lines, {**solver.params, **solver_params(solver, **size_knobs)}
+
+
+def main(args: ap.Namespace) -> int:
+    """
+    Run the benchmark suite and write the report
+    """
+    timings: List[Timing] = []
+    for solver in select_solvers(args.days, args.parts):
+        try:
+            load(solver)
+        except ImportError as err:
+            print(f"{solver.name:<12} skipped: {err}", file=sys.stderr)
+            continue
+        if args.sizes:
+            cases = generated_cases(
+                solver, args.sizes, args.seed, parse_knobs(args.knobs)
+            )
+        else:
+            cases = checked_in_cases(solver, args.examples_only)
+        for label, lines, params in cases:
+            timing = time_case(solver, label, lines, params, args.repeat)
+            print(
+                f"{timing.solver:<12} {timing.input:<28} "
+                f"parse {timing.parse_median:10.6f}s "
+                f"solve {timing.solve_median:10.6f}s",
+                file=sys.stderr,
+            )
+            timings.append(timing)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as outfile:
+            if args.output.endswith(".csv"):
+                write_csv(timings, outfile)
+            else:
+                write_json(timings, outfile)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as infile:
+            regressions = compare(
+                timings, json.load(infile), args.threshold, args.min_delta
+            )
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = ap.ArgumentParser()
+    parser.add_argument("--days", nargs="*", type=int)
+    parser.add_argument("--parts", nargs="*", choices=["1", "2", "both"])
+    parser.add_argument("--repeat", default=5, type=int)
+    parser.add_argument("--examples-only", action="store_true")
+    parser.add_argument("--sizes", nargs="*", type=int, help="generated input sizes")
+    parser.add_argument("--seed", default=0, type=int)
+    parser.add_argument("--knobs", nargs="*", default=[], help="generator name=value")
+    parser.add_argument("--output", help="report file, .csv for CSV otherwise JSON")
+    parser.add_argument("--baseline", help="previous JSON report to compare against")
+    parser.add_argument("--threshold", default=1.2, type=float)
+    parser.add_argument("--min-delta", default=0.001, type=float)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,249 @@
+"""
+On-disk cache of solver results.
+
+Entries are keyed by a hash of the input bytes, the day/part, the full set
+of solve parameters and a fingerprint of the source of the solver module
+and the aoclib modules it imports, so editing a solver or the shared code
+it uses invalidates its entries without any manual step. Bumping
+CACHE_VERSION invalidates everything. Each entry is a small JSON file whose
+modification time records its last use; when the cache grows past its size
+bound the least recently used entries are removed.
+
+Usage:
+    python -m aoclib.cache --cache-dir ~/.cache/aoc2022 --stats
+    python -m aoclib.cache --cache-dir ~/.cache/aoc2022 --clear
+"""
+import argparse as ap
+import ast
+import functools
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from aoclib.solvers import Result, Solver, run
+
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def read_source(module: str) -> bytes:
+    """
+    Read a module's source, without importing it
+    Params:
+        module: dotted module path
+    Returns: contents of the source file
+    """
+    spec = importlib.util.find_spec(module)
+    assert spec is not None and spec.origin is not None
+    with open(spec.origin, "rb") as infile:
+        return infile.read()
+
+
+def aoclib_imports(source: bytes) -> Set[str]:
+    """
+    Find the aoclib modules a source file imports
+    Params:
+        source: module source
+    Returns: dotted paths of the imported aoclib modules
+    """
+    found: Set[str] = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.ImportFrom) and node.module == "aoclib":
+            found.update(f"aoclib.{alias.name}" for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            if node.module.startswith("aoclib."):
+                found.add(node.module)
+        elif isinstance(node, ast.Import):
+            found.update(
+                alias.name for alias in node.names if alias.name.startswith("aoclib.")
+            )
+    return found
+
+
+@functools.lru_cache(maxsize=None)
+def code_fingerprint(module: str) -> str:
+    """
+    Hash of a solver module's source and of every aoclib module it imports,
+    directly or through another aoclib module
+    Params:
+        module: dotted module path
+    Returns: hex digest of the source files
+    """
+    digest = hashlib.sha256()
+    seen: Set[str] = set()
+    pending = [module]
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        source = read_source(name)
+        digest.update(f"{name}\0{len(source)}\0".encode())
+        digest.update(source)
+        # sorted so the digest does not depend on set order
+        pending.extend(sorted(aoclib_imports(source) - seen, reverse=True))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Size-bounded LRU store of solver results in a directory
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """
+        Params:
+            directory: where entries are stored, created if missing
+            max_bytes: total entry size above which old entries are evicted
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size: Optional[int] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, solver: Solver, data: bytes, params: Dict[str, Any]) -> str:
+        """
+        Build the cache key for an input
+        Params:
+            solver: entry point that solves the input
+            data: raw input bytes
+            params: solve parameters, merged over the solver defaults
+        Returns: hex digest identifying the result
+        """
+        digest = hashlib.sha256()
+        digest.update(f"v{CACHE_VERSION}\0{solver.name}\0".encode())
+        digest.update(code_fingerprint(solver.module).encode())
+        digest.update(json.dumps({**solver.params, **params}, sort_keys=True).encode())
+        digest.update(b"\0")
+        digest.update(data)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def get(self, key: str) -> Optional[Result]:
+        """
+        Look up a result, marking it as recently used
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as infile:
+                result = json.load(infile)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, key: str, result: Result) -> None:
+        """
+        Store a result, evicting old entries if the cache is over its bound
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = json.dumps(result).encode()
+        # write then rename so concurrent readers never see a partial entry
+        handle, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(handle, "wb") as outfile:
+            outfile.write(payload)
+        os.replace(tmp_path, path)
+
+        if self._size is None:
+            self._size = sum(size for _path, size, _mtime in self.entries())
+        else:
+            self._size += len(payload)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        """
+        List every entry as (path, size, last used time)
+        """
+        found: List[Tuple[str, int, float]] = []
+        for dirpath, _dirnames, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if not filename.endswith(".json"):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                found.append((path, stat.st_size, stat.st_mtime))
+        return found
+
+    def evict(self) -> None:
+        """
+        Remove least recently used entries until the cache is back under
+        three quarters of its bound, leaving room before the next eviction
+        """
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        size = sum(entry[1] for entry in entries)
+        for path, entry_size, _mtime in entries:
+            if size <= self.max_bytes * 3 // 4:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= entry_size
+        self._size = size
+
+    def clear(self) -> None:
+        """
+        Remove every entry
+        """
+        for path, _size, _mtime in self.entries():
+            os.remove(path)
+        self._size = 0
+
+
+def cached_run(
+    cache: Optional[ResultCache],
+    solver: Solver,
+    data: bytes,
+    params: Optional[Dict[str, Any]] = None,
+) -> Tuple[Result, bool]:
+    """
+    Solve an input, reusing a cached result when there is one. A hit skips
+    parsing and solving entirely.
+    Params:
+        cache: result cache, or None to always solve
+        solver: entry point to run
+        data: raw input bytes
+        params: overrides for the solver's default parameters
+    Returns: the result and whether it came from the cache
+    """
+    params = params or {}
+    key = cache.key(solver, data, params) if cache else ""
+    if cache:
+        result = cache.get(key)
+        if result is not None:
+            return result, True
+    result = run(solver, io.StringIO(data.decode("utf-8"), newline=None), params)
+    if cache:
+        cache.put(key, result)
+    return result, False
+
+
+if __name__ == "__main__":
+    parser = ap.ArgumentParser()
+    parser.add_argument("--cache-dir", required=True)
+    parser.add_argument("--clear", action="store_true")
+    parser.add_argument("--stats", action="store_true")
+    args = parser.parse_args()
+
+    result_cache = ResultCache(args.cache_dir)
+    if args.clear:
+        result_cache.clear()
+    if args.stats:
+        all_entries = result_cache.entries()
+        print(f"Entries: {len(all_entries)}")
+        print(f"Bytes: {sum(size for _path, size, _mtime in all_entries)}")
@@ -0,0 +1,422 @@
+"""
+Seeded, deterministic input generators for every puzzle.
+
+Each generator takes a random.Random instance plus keyword size knobs and
+yields input lines without their trailing newline. The same seed and knobs
+always produce the same input.
+
+Usage:
+    python -m aoclib.generators 7 dirs=100000 depth=40 --seed 1 --output big7.txt
+"""
+import argparse as ap
+import json
+import random
+import string
+import sys
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from aoclib.solvers import Solver
+
+
+def generate_day1(
+    rng: random.Random, elves: int = 1000, items: int = 15
+) -> Iterator[str]:
+    """
+    Calorie blocks - up to items lines per elf, blank line between elves
+    """
+    for elf in range(elves):
+        if elf:
+            yield ""
+        for _i in range(rng.randint(1, items)):
+            yield str(rng.randint(1000, 70000))
+
+
+def generate_day2(rng: random.Random, rounds: int = 2500) -> Iterator[str]:
+    """
+    Strategy guide lines of the form "A X"
+    """
+    for _i in range(rounds):
+        yield f"{rng.choice('ABC')} {rng.choice('XYZ')}"
+
+
+def generate_day3(
+    rng: random.Random, groups: int = 100, length: int = 16
+) -> Iterator[str]:
+    """
+    Rucksacks in groups of three. Each rucksack has length items per
+    compartment with exactly one item type shared by both compartments, and
+    each group shares exactly one badge item type.
+    """
+    length = max(length, 2)
+    for _group in range(groups):
+        letters = list(string.ascii_letters)
+        rng.shuffle(letters)
+        badge = letters.pop()
+        for elf in range(3):
+            # disjoint pools keep the badge the only item common to the group
+            pool = letters[elf * 17 : (elf + 1) * 17]
+            shared, first_pool, second_pool = pool[0], pool[1:9], pool[9:]
+            first = [shared, badge] + rng.choices(first_pool, k=length - 2)
+            second = [shared] + rng.choices(second_pool, k=length - 1)
+            rng.shuffle(first)
+            rng.shuffle(second)
+            yield "".join(first) + "".join(second)
+
+
+def generate_day4(
+    rng: random.Random, pairs: int = 1000, sections: int = 99
+) -> Iterator[str]:
+    """
+    Section assignment pairs of the form "a-b,c-d"
+    """
+    for _i in range(pairs):
+        ranges = []
+        for _j in range(2):
+            start = rng.randint(1, sections)
+            ranges.append(f"{start}-{rng.randint(start, sections)}")
+        yield ",".join(ranges)
+
+
+def generate_day5(
+    rng: random.Random,
+    stacks: int = 9,
+    height: int = 8,
+    moves: int = 500,
+    max_move: int = 10,
+) -> Iterator[str]:
+    """
+    Crate drawing followed by move lines. Moves never empty a stack so every
+    stack has a top crate at the end for either crane model.
+    """
+    heights = [rng.randint(1, height) for _i in range(stacks)]
+    heights[0] = max(heights[0], 2)
+    tallest = max(heights)
+    for row in range(tallest, 0, -1):
+        cells = [
+            f"[{rng.choice(string.ascii_uppercase)}]" if heights[i] >= row else "   "
+            for i in range(stacks)
+        ]
+        yield " ".join(cells)
+    # keep every fourth column blank, as the drawing parser expects
+    yield " ".join(f" {i + 1:<2}" for i in range(stacks))
+    yield ""
+
+    for _i in range(moves):
+        src = rng.choice([i for i in range(stacks) if heights[i] > 1])
+        dest = rng.choice([i for i in range(stacks) if i != src] or [src])
+        num = rng.randint(1, min(max_move, heights[src] - 1))
+        heights[src] -= num
+        heights[dest] += num
+        yield f"move {num} from {src + 1} to {dest + 1}"
+
+
+def generate_day6(rng: random.Random, length: int = 4096) -> Iterator[str]:
+    """
+    A single datastream line with both markers at the very end, so the whole
+    stream has to be scanned
+    """
+    prefix = "".join(rng.choice("abc") for _i in range(max(length - 14, 0)))
+    yield prefix + "".join(rng.sample(string.ascii_lowercase[3:], 14))
+
+
+def generate_day7(
+    rng: random.Random, dirs: int = 200, depth: int = 10, files: int = 5
+) -> Iterator[str]:
+    """
+    Terminal log of cd/ls commands exploring a tree of dirs directories.
+    The first depth directories form a single chain so the tree is exactly
+    that deep, the rest hang off random parents. Each directory holds up to
+    files files.
+    """
+    depth = max(depth, 1)
+    parents = [-1]
+    levels = [0]
+    children: List[List[int]] = [[]]
+    for node in range(1, max(dirs, 1)):
+        if node <= depth:
+            parent = node - 1
+        else:
+            parent = rng.randrange(node)
+            while levels[parent] >= depth:
+                parent = parents[parent]
+        parents.append(parent)
+        levels.append(levels[parent] + 1)
+        children.append([])
+        children[parent].append(node)
+
+    def listing(node: int) -> Iterator[str]:
+        yield "$ ls"
+        for child in children[node]:
+            yield f"dir d{child}"
+        for index in range(rng.randint(0, files)):
+            yield f"{rng.randint(1, 300000)} f{index}.txt"
+
+    yield "$ cd /"
+    yield from listing(0)
+    # explicit stack so deep trees don't hit the recursion limit
+    stack = [iter(children[0])]
+    while stack:
+        child = next(stack[-1], None)
+        if child is None:
+            stack.pop()
+            if stack:
+                yield "$ cd .."
+            continue
+        yield f"$ cd d{child}"
+        yield from listing(child)
+        stack.append(iter(children[child]))
+
+
+def generate_day8(
+    rng: random.Random, rows: int = 99, cols: Optional[int] = None
+) -> Iterator[str]:
+    """
+    Tree height grid of digits, square unless cols is given
+    """
+    for _i in range(rows):
+        yield "".join(rng.choice(string.digits) for _j in range(cols or rows))
+
+
+def generate_day9(
+    rng: random.Random, moves: int = 2000, max_step: int = 20
+) -> Iterator[str]:
+    """
+    Rope moves of the form "R 4"
+    """
+    for _i in range(moves):
+        yield f"{rng.choice('RLUD')} {rng.randint(1, max_step)}"
+
+
+def generate_day10(rng: random.Random, instructions: int = 150) -> Iterator[str]:
+    """
+    noop and addx instructions
+    """
+    for _i in range(instructions):
+        if rng.random() < 0.3:
+            yield "noop"
+        else:
+            yield f"addx {rng.randint(-20, 20)}"
+
+
+PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61]
+
+
+def generate_day11(
+    rng: random.Random, monkeys: int = 8, items: int = 5
+) -> Iterator[str]:
+    """
+    Monkey specifications, each holding up to items starting items. Monkeys
+    never throw to themselves.
+    """
+    monkeys = max(monkeys, 2)
+    for monkey in range(monkeys):
+        if monkey:
+            yield ""
+        others = [other for other in range(monkeys) if other != monkey]
+        worries = [str(rng.randint(50, 99)) for _i in range(rng.randint(1, items))]
+        operation = rng.choice(
+            [f"old * {rng.randint(2, 19)}", f"old + {rng.randint(1, 8)}", "old * old"]
+        )
+        yield f"Monkey {monkey}:"
+        yield f"  Starting items: {', '.join(worries)}"
+        yield f"  Operation: new = {operation}"
+        yield f"  Test: divisible by {rng.choice(PRIMES)}"
+        yield f"    If true: throw to monkey {rng.choice(others)}"
+        yield f"    If false: throw to monkey {rng.choice(others)}"
+
+
+def generate_day12(
+    rng: random.Random, rows: int = 41, cols: Optional[int] = None, noise: int = 3
+) -> Iterator[str]:
+    """
+    Height map that climbs from 'a' on the left to 'z' on the right. The
+    middle row climbs one step at a time so the end is always reachable, the
+    other cells are lowered by up to noise levels. cols is at least 26.
+    """
+    cols = max(cols or rows, 26)
+    path_row = rows // 2
+    for row in range(rows):
+        cells = []
+        for col in range(cols):
+            height = col * 25 // (cols - 1)
+            if row != path_row:
+                height = max(height - rng.randint(0, noise), 0)
+            cells.append(chr(ord("a") + height))
+        if row == path_row:
+            cells[0] = "S"
+            cells[-1] = "E"
+        yield "".join(cells)
+
+
+def generate_day13(
+    rng: random.Random, pairs: int = 150, depth: int = 4, width: int = 5
+) -> Iterator[str]:
+    """
+    Packet pairs of nested lists up to depth levels deep and width entries
+    wide, pairs separated by a blank line
+    """
+
+    def packet(level: int) -> List[Any]:
+        entries: List[Any] = []
+        for _i in range(rng.randint(0, width)):
+            if level < depth and rng.random() < 0.3:
+                entries.append(packet(level + 1))
+            else:
+                entries.append(rng.randint(0, 10))
+        return entries
+
+    for pair in range(pairs):
+        if pair:
+            yield ""
+        yield json.dumps(packet(1), separators=(",", ":"))
+        yield json.dumps(packet(1), separators=(",", ":"))
+
+
+def generate_day14(
+    rng: random.Random,
+    paths: int = 150,
+    segments: int = 5,
+    width: int = 60,
+    depth: int = 160,
+) -> Iterator[str]:
+    """
+    Rock paths of alternating horizontal and vertical segments within width
+    columns either side of the sand source and depth rows below it.
+    Rock starts width + 2 rows down so sand always spills off the rock before
+    piling up to the source. Two walls beyond the widest possible sand pile
+    keep every grain within the mapped columns.
+    """
+    top = width + 2
+    for _i in range(paths):
+        col = rng.randint(500 - width, 500 + width)
+        row = rng.randint(top, top + depth)
+        points = [f"{col},{row}"]
+        for segment in range(rng.randint(1, segments)):
+            if segment % 2 == 0:
+                col = min(max(col + rng.randint(-8, 8), 500 - width), 500 + width)
+            else:
+                row = min(max(row + rng.randint(-8, 8), top), top + depth)
+            points.append(f"{col},{row}")
+        yield " -> ".join(points)
+    wall = width + top + depth + 4
+    yield f"{500 - wall},0 -> {500 - wall},{top + depth}"
+    yield f"{500 + wall},0 -> {500 + wall},{top + depth}"
+
+
+def generate_day15(
+    rng: random.Random, sensors: int = 25, max_coord: int = 4000000
+) -> Iterator[str]:
+    """
+    Sensor lines leaving exactly one uncovered position within 0..max_coord.
+    Four sensors diagonally max_coord away from the hidden beacon cover the
+    whole search area except that position, the rest are scattered with
+    ranges that stop short of it.
+    """
+    hidden_x = rng.randint(0, max_coord)
+    hidden_y = rng.randint(0, max_coord)
+    readings = []
+    for sign_x, sign_y in ((1, 1), (1, -1), (-1, 1), (-1, -1)):
+        sensor = (hidden_x + sign_x * max_coord, hidden_y + sign_y * max_coord)
+        readings.append((sensor, (hidden_x, hidden_y + sign_y)))
+    for _i in range(max(sensors - 4, 0)):
+        sensor_x = rng.randint(0, max_coord)
+        sensor_y = rng.randint(0, max_coord)
+        reach = abs(sensor_x - hidden_x) + abs(sensor_y - hidden_y) - 1
+        if reach < 1:
+            continue
+        distance = rng.randint(1, reach)
+        delta_x = rng.randint(0, distance)
+        beacon = (
+            sensor_x + rng.choice((1, -1)) * delta_x,
+            sensor_y + rng.choice((1, -1)) * (distance - delta_x),
+        )
+        readings.append(((sensor_x, sensor_y), beacon))
+    rng.shuffle(readings)
+    for (sensor_x, sensor_y), (beacon_x, beacon_y) in readings:
+        yield (
+            f"Sensor at x={sensor_x}, y={sensor_y}: "
+            f"closest beacon is at x={beacon_x}, y={beacon_y}"
+        )
+
+
+class Generator(NamedTuple):
+    """
+    A generator along with the knob that controls its input size
+    """
+
+    generate: Callable[..., Iterator[str]]
+    scale: str
+
+
+GENERATORS: Dict[int, Generator] = {
+    1: Generator(generate_day1, "elves"),
+    2: Generator(generate_day2, "rounds"),
+    3: Generator(generate_day3, "groups"),
+    4: Generator(generate_day4, "pairs"),
+    5: Generator(generate_day5, "moves"),
+    6: Generator(generate_day6, "length"),
+    7: Generator(generate_day7, "dirs"),
+    8: Generator(generate_day8, "rows"),
+    9: Generator(generate_day9, "moves"),
+    10: Generator(generate_day10, "instructions"),
+    11: Generator(generate_day11, "items"),
+    12: Generator(generate_day12, "rows"),
+    13: Generator(generate_day13, "pairs"),
+    14: Generator(generate_day14, "paths"),
+    15: Generator(generate_day15, "sensors"),
+}
+
+
+def generate(day: int, seed: int = 0, **knobs: int) -> Iterator[str]:
+    """
+    Generate an input for a day
+    Params:
+        day: puzzle day number
+        seed: random seed
+        knobs: size knobs accepted by that day's generator
+    Returns: iterator over input lines
+    """
+    return GENERATORS[day].generate(random.Random(seed), **knobs)
+
+
+def solver_params(solver: Solver, **knobs: int) -> Dict[str, Any]:
+    """
+    Solver parameter overrides a generated input needs
+    Params:
+        solver: entry point that will solve the input
+        knobs: size knobs the input was generated with
+    Returns: keyword parameters for the solver, limited to those it accepts
+    """
+    params: Dict[str, Any] = {}
+    if solver.day == 15:
+        max_coord = knobs.get("max_coord", 4000000)
+        params = {"target_row": max_coord // 2, "max_coord": max_coord}
+    return {name: value for name, value in params.items() if name in solver.params}
+
+
+def parse_knobs(knob_strs: List[str]) -> Dict[str, int]:
+    """
+    Convert name=value strings into a knob dictionary
+    """
+    knobs: Dict[str, int] = {}
+    for knob_str in knob_strs:
+        name, value = knob_str.split("=")
+        knobs[name.replace("-", "_")] = int(value)
+    return knobs
+
+
+if __name__ == "__main__":
+    parser = ap.ArgumentParser()
+    parser.add_argument("day", type=int, choices=sorted(GENERATORS))
+    parser.add_argument("knobs", nargs="*", help="size knobs as name=value")
+    parser.add_argument("--seed", default=0, type=int)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    outfile = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for line in generate(args.day, args.seed, **parse_knobs(args.knobs)):
+            outfile.write(line + "\n")
+    finally:
+        if outfile is not sys.stdout:
+            outfile.close()
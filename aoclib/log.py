@@ -0,0 +1,60 @@
+"""
+Leveled logging shared by the solvers.
+
+Answers are logged at INFO and per-step diagnostics at DEBUG. Messages use
+logging's deferred %-formatting, and lazy() defers building an expensive
+message argument, so nothing is formatted unless the level is enabled.
+Solvers run from the benchmark, batch or server tooling log nothing below
+WARNING; the dayN command lines show answers by default and restore the
+full diagnostic output with --verbose.
+"""
+import argparse as ap
+import logging
+import sys
+from typing import Any, Callable
+
+DEBUG = logging.DEBUG
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Return the logger for a solver module
+    """
+    return logging.getLogger(name)
+
+
+class lazy:  # pylint: disable=invalid-name
+    """
+    Message argument that is only computed if the message is emitted, e.g.
+    LOG.debug("%s", lazy(cave_map.draw))
+    """
+
+    def __init__(self, func: Callable[..., Any], *args: Any) -> None:
+        self.func = func
+        self.args = args
+
+    def __str__(self) -> str:
+        return str(self.func(*self.args))
+
+
+def add_arguments(parser: ap.ArgumentParser) -> None:
+    """
+    Add the shared logging options to a solver's argument parser
+    """
+    parser.add_argument(
+        "--verbose", action="store_true", help="show per-step diagnostic output"
+    )
+
+
+def setup(verbose: bool) -> None:
+    """
+    Configure logging for a solver run from the command line. Messages go to
+    stdout unadorned so the output reads as plain program output.
+    Params:
+        verbose: show DEBUG diagnostics as well as the answers
+    """
+    logging.basicConfig(
+        level=logging.DEBUG if verbose else logging.INFO,
+        format="%(message)s",
+        stream=sys.stdout,
+    )
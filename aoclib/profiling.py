@@ -0,0 +1,167 @@
+"""
+Profiling hooks shared by the solver command lines.
+
+Every dayN script accepts --profile STATS_FILE. The run is profiled with
+cProfile, whose stats are written to STATS_FILE for pstats or snakeviz, and
+tracemalloc records the time and peak memory of the parse and solve phases
+separately. The phase report is written to stderr so the answers on stdout
+are unchanged; --profile-top N adds the N functions with the most own time.
+Solvers that stream their input do most of their reading during the solve
+phase.
+
+    python day7/day7.py day7/day7.txt --profile day7.prof --profile-top 10
+    python -m pstats day7.prof
+
+Without --profile, phase() does nothing, so the hooks cost nothing in
+normal runs or under the benchmark, batch and server tools.
+"""
+import argparse as ap
+import cProfile
+import io
+import pstats
+import sys
+import time
+import tracemalloc
+from types import TracebackType
+from typing import List, NamedTuple, Optional, TextIO, Type
+
+
+class PhaseStats(NamedTuple):
+    """
+    Measurements of one phase of a profiled run
+    """
+
+    name: str
+    seconds: float
+    peak_bytes: int
+
+
+class Session:
+    """
+    cProfile and tracemalloc state of a profiled run
+    """
+
+    def __init__(self, stats_file: str, top: int) -> None:
+        """
+        Params:
+            stats_file: where the cProfile stats are written
+            top: number of hot functions to list in the report
+        """
+        self.stats_file = stats_file
+        self.top = top
+        self.profiler = cProfile.Profile()
+        self.phases: List[PhaseStats] = []
+
+    def report(self, stream: TextIO) -> None:
+        """
+        Write the phase measurements and the hot functions
+        """
+        for stats in self.phases:
+            stream.write(
+                f"{stats.name:<6} {stats.seconds:10.6f}s "
+                f"peak {stats.peak_bytes / 1024 / 1024:10.3f} MiB\n"
+            )
+        stream.write(f"cProfile stats written to {self.stats_file}\n")
+        if self.top:
+            summary = io.StringIO()
+            pstats.Stats(self.profiler, stream=summary).sort_stats(
+                pstats.SortKey.TIME
+            ).print_stats(self.top)
+            stream.write(summary.getvalue())
+
+
+# session of the current run, set up by profile()
+ACTIVE: Optional[Session] = None
+
+
+class Phase:
+    """
+    Context manager measuring one phase of the active session, if any
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.session = ACTIVE
+        self.start = 0.0
+        self.base_bytes = 0
+
+    def __enter__(self) -> None:
+        if self.session is None:
+            return
+        tracemalloc.reset_peak()
+        self.base_bytes = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        self.session.profiler.enable()
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        if self.session is None:
+            return
+        self.session.profiler.disable()
+        seconds = time.perf_counter() - self.start
+        peak_bytes = tracemalloc.get_traced_memory()[1] - self.base_bytes
+        self.session.phases.append(PhaseStats(self.name, seconds, peak_bytes))
+
+
+def phase(name: str) -> Phase:
+    """
+    Measure a phase of the run, e.g. with profiling.phase("parse"): ...
+    Params:
+        name: phase name shown in the report
+    """
+    return Phase(name)
+
+
+def add_arguments(parser: ap.ArgumentParser) -> None:
+    """
+    Add the shared profiling options to a solver's argument parser
+    """
+    parser.add_argument(
+        "--profile",
+        metavar="STATS_FILE",
+        help="profile the run, writing cProfile stats to STATS_FILE and the "
+        "time and peak memory of each phase to stderr",
+    )
+    parser.add_argument(
+        "--profile-top",
+        default=0,
+        type=int,
+        metavar="N",
+        help="with --profile, also list the N functions with the most own time",
+    )
+
+
+class profile:  # pylint: disable=invalid-name
+    """
+    Profile the phases run inside it when stats_file is set, e.g.
+    with profiling.profile(args.profile, args.profile_top):
+        main(args.filename)
+    """
+
+    def __init__(self, stats_file: Optional[str], top: int = 0) -> None:
+        self.session = Session(stats_file, top) if stats_file else None
+
+    def __enter__(self) -> None:
+        global ACTIVE  # pylint: disable=global-statement
+        if self.session is None:
+            return
+        tracemalloc.start()
+        ACTIVE = self.session
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        global ACTIVE  # pylint: disable=global-statement
+        if self.session is None:
+            return
+        ACTIVE = None
+        tracemalloc.stop()
+        self.session.profiler.dump_stats(self.session.stats_file)
+        self.session.report(sys.stderr)
@@ -0,0 +1,136 @@
+"""
+Streaming input readers shared by the solvers.
+
+Each reader consumes its source lazily and yields as it goes, so a solver
+built on them holds one line, record or group at a time rather than the
+whole input as a list of strings. MappedInput instead memory maps a file
+and hands out lines as memoryview slices of the mapping, so grid rows can
+be indexed in place without decoding or copying the file.
+"""
+import itertools
+import mmap
+import os
+from types import TracebackType
+from typing import Iterable, Iterator, List, Optional, Tuple, Type, TypeVar
+
+Item = TypeVar("Item")
+
+
+def lines(source: Iterable[str]) -> Iterator[str]:
+    """
+    Yield each line without its line ending
+    Params:
+        source: open file or any iterable of lines
+    Returns: iterator over the stripped lines
+    """
+    for line in source:
+        yield line.rstrip("\r\n")
+
+
+def records(source: Iterable[str]) -> Iterator[List[str]]:
+    """
+    Yield the blank line separated records of an input, e.g. one elf's
+    calories or one monkey's description
+    Params:
+        source: open file or any iterable of lines
+    Returns: iterator over records, each a list of its non-blank lines
+    """
+    record: List[str] = []
+    for line in lines(source):
+        if line.strip():
+            record.append(line)
+        elif record:
+            yield record
+            record = []
+    if record:
+        yield record
+
+
+def groups(items: Iterable[Item], size: int) -> Iterator[Tuple[Item, ...]]:
+    """
+    Yield consecutive fixed size groups, e.g. the three rucksacks of a group
+    of elves
+    Params:
+        items: lines or parsed items
+        size: number of items in each group
+    Returns: iterator over tuples of size items
+    Raises: ValueError if the items do not divide into whole groups
+    """
+    iterator = iter(items)
+    while True:
+        group = tuple(itertools.islice(iterator, size))
+        if not group:
+            return
+        if len(group) < size:
+            raise ValueError(f"Incomplete group of {len(group)}, expected {size}")
+        yield group
+
+
+class MappedInput:
+    """
+    Read-only memory map of an input file, used as a context manager. Lines
+    are memoryview slices of the mapping and must be dropped before it
+    closes, or closing raises BufferError.
+    """
+
+    def __init__(self, fname: str) -> None:
+        self._file = open(fname, "rb")  # pylint: disable=consider-using-with
+        self._map: Optional[mmap.mmap] = None
+        if os.fstat(self._file.fileno()).st_size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __enter__(self) -> "MappedInput":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        try:
+            self.close()
+        except BufferError:
+            if exc_type is None:
+                raise
+            # the traceback of the exception leaving the block still holds
+            # a line; the mapping is released when that goes away
+
+    def close(self) -> None:
+        """
+        Unmap and close the file
+        Raises: BufferError if a line is still referenced
+        """
+        try:
+            if self._map is not None:
+                self._map.close()
+        finally:
+            self._file.close()
+
+    def lines(self) -> Iterator[memoryview]:
+        """
+        Yield each line without its line ending, without copying
+        Returns: iterator over memoryview slices of the mapping. Indexing a
+        slice gives the byte value at that column.
+        """
+        if self._map is None:
+            return
+        view = memoryview(self._map)
+        start = 0
+        while start < len(view):
+            end = self._map.find(b"\n", start)
+            if end < 0:
+                end = len(view)
+            next_start = end + 1
+            if end > start and view[end - 1] == ord("\r"):
+                end -= 1
+            yield view[start:end]
+            start = next_start
+
+    def text_lines(self) -> Iterator[str]:
+        """
+        Yield each line decoded to a string, one line at a time, for solvers
+        that parse text
+        """
+        for line in self.lines():
+            yield str(line, "utf-8")
@@ -0,0 +1,230 @@
+"""
+Resident solver daemon reachable over a local Unix domain socket.
+
+Every solver module is imported once at startup, in the server and in each
+worker process, so requests pay neither interpreter start nor import time.
+Requests and responses are single JSON lines:
+
+    {"id": 1, "day": 7, "part": "both", "path": "day7/day7.txt"}
+    {"id": 2, "day": 11, "part": "2", "input": "Monkey 0:\\n...", "params": {}}
+    -> {"id": 1, "result": {...}, "cached": false, "seconds": 0.01}
+
+Solves run in a process pool so a slow request never blocks the event loop
+or the cheap requests queued behind it. A connection may send any number of
+requests, answered in order.
+
+Usage:
+    python -m aoclib.server --socket /tmp/aoc.sock serve --workers 4
+    python -m aoclib.server --socket /tmp/aoc.sock solve 7 day7/day7.txt
+"""
+import argparse as ap
+import asyncio
+import concurrent.futures
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Any, Dict, Optional
+
+from aoclib import batch
+from aoclib.cache import DEFAULT_MAX_BYTES, cached_run
+from aoclib.solvers import find_solver, preload
+
+LOG = logging.getLogger(__name__)
+
+# requests carry the whole input inline, so allow lines far beyond the
+# asyncio default of 64 KiB
+MAX_REQUEST_BYTES = 1 << 30
+
+
+def init_worker(cache_dir: Optional[str], cache_bytes: int) -> None:
+    """
+    Import every solver and open the result cache in a worker process
+    """
+    preload()
+    batch.init_worker(cache_dir, cache_bytes)
+
+
+def read_file(path: str) -> bytes:
+    """
+    Read a whole input file
+    """
+    with open(path, "rb") as infile:
+        return infile.read()
+
+
+def solve_input(
+    day: int, part: str, data: bytes, params: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Solve one request inside a worker process
+    Params:
+        day: puzzle day number
+        part: "1", "2" or "both"
+        data: raw input bytes
+        params: overrides for the solver's default parameters
+    Returns: the result and whether it came from the cache
+    """
+    solver = find_solver(day, part)
+    result, cached = cached_run(batch.WORKER_CACHE, solver, data, params)
+    return {"result": result, "cached": cached}
+
+
+class SolverServer:
+    """
+    asyncio front end dispatching solve requests to a process pool
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        cache_dir: Optional[str] = None,
+        cache_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.workers = workers
+        self.pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_worker,
+            initargs=(cache_dir, cache_bytes),
+        )
+
+    async def warm_up(self) -> None:
+        """
+        Start every worker now rather than on the first requests
+        """
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *[loop.run_in_executor(self.pool, preload) for _i in range(self.workers)]
+        )
+
+    async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Solve a single decoded request
+        Params:
+            request: day, part, params and either input text or a path
+        Returns: response to send back
+        """
+        if "input" in request:
+            data = request["input"].encode("utf-8")
+        else:
+            # off the event loop, so a large file does not stall other
+            # connections
+            data = await asyncio.to_thread(read_file, request["path"])
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.pool,
+            solve_input,
+            int(request["day"]),
+            str(request.get("part", "both")),
+            data,
+            request.get("params", {}),
+        )
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Answer every request line sent on one connection
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                start = time.perf_counter()
+                response: Dict[str, Any] = {}
+                try:
+                    request = json.loads(line)
+                    response["id"] = request.get("id")
+                    response.update(await self.handle_request(request))
+                except Exception as err:  # pylint: disable=broad-except
+                    response["error"] = f"{type(err).__name__}: {err}"
+                response["seconds"] = time.perf_counter() - start
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path: str) -> None:
+        """
+        Listen on the socket until SIGINT or SIGTERM
+        """
+        failures = preload()
+        for module, reason in failures.items():
+            LOG.warning("Could not preload %s: %s", module, reason)
+        await self.warm_up()
+
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = await asyncio.start_unix_server(
+            self.handle_connection, path=socket_path, limit=MAX_REQUEST_BYTES
+        )
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        LOG.info("Serving on %s with %d workers", socket_path, self.workers)
+        try:
+            async with server:
+                await stop.wait()
+        finally:
+            os.remove(socket_path)
+            self.pool.shutdown(cancel_futures=True)
+
+
+def request(socket_path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Send one request to a running server and wait for the response
+    Params:
+        socket_path: server socket
+        payload: request to send
+    Returns: decoded response
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(payload).encode() + b"\n")
+        with sock.makefile("rb") as response:
+            return json.loads(response.readline())
+
+
+if __name__ == "__main__":
+    parser = ap.ArgumentParser()
+    parser.add_argument("--socket", default="/tmp/aoc2022.sock")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve")
+    serve_parser.add_argument("--workers", default=os.cpu_count() or 1, type=int)
+    serve_parser.add_argument("--cache-dir")
+    serve_parser.add_argument("--cache-bytes", default=DEFAULT_MAX_BYTES, type=int)
+    solve_parser = commands.add_parser("solve")
+    solve_parser.add_argument("day", type=int)
+    solve_parser.add_argument("filename")
+    solve_parser.add_argument("--part", default="both")
+    solve_parser.add_argument("--params", default="{}", help="JSON object")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        # only the server's own messages; solvers in the workers stay quiet
+        LOG.addHandler(logging.StreamHandler())
+        LOG.setLevel(logging.INFO)
+        asyncio.run(
+            SolverServer(args.workers, args.cache_dir, args.cache_bytes).serve(
+                args.socket
+            )
+        )
+    else:
+        reply = request(
+            args.socket,
+            {
+                "day": args.day,
+                "part": args.part,
+                "path": os.path.abspath(args.filename),
+                "params": json.loads(args.params),
+            },
+        )
+        print(json.dumps(reply))
+        sys.exit(1 if "error" in reply else 0)
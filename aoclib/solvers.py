@@ -0,0 +1,309 @@
+"""
+Registry of every day/part entry point along with the parameters and
+checked-in inputs used to exercise it.
+
+Each solver module exposes a parse(lines) function that builds the puzzle
+state and a solve function that takes that state plus keyword parameters
+and returns a dictionary of results.
+"""
+import importlib
+import os
+import sys
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# day directories have no __init__.py, they import as namespace packages
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+Result = Dict[str, Any]
+
+
+class Solver(NamedTuple):
+    """
+    A single entry point
+    day: puzzle day number
+    part: "1", "2" or "both" when one solve answers both parts
+    module: dotted module path relative to the repository root
+    solve: name of the solve function within the module
+    params: default keyword parameters for solve, matching the CLI defaults
+    inputs: checked-in input files, relative to the repository root, mapped
+            to the parameter overrides that input needs
+    """
+
+    day: int
+    part: str
+    module: str
+    solve: str
+    params: Dict[str, Any]
+    inputs: Dict[str, Dict[str, Any]]
+
+    @property
+    def name(self) -> str:
+        """
+        Short identifier used in reports, e.g. day9-p2
+        """
+        if self.part == "both":
+            return f"day{self.day}"
+        return f"day{self.day}-p{self.part}"
+
+
+SOLVERS: List[Solver] = [
+    Solver(
+        1,
+        "both",
+        "day1.day1",
+        "solve",
+        {"top": 3},
+        {"day1/day1-example.txt": {}, "day1/day1.txt": {}},
+    ),
+    Solver(
+        2,
+        "1",
+        "day2.day2",
+        "solve_part1",
+        {},
+        {"day2/day2-example.txt": {}, "day2/day2.txt": {}},
+    ),
+    Solver(
+        2,
+        "2",
+        "day2.day2",
+        "solve_part2",
+        {},
+        {"day2/day2-example.txt": {}, "day2/day2.txt": {}},
+    ),
+    Solver(
+        2,
+        "both",
+        "day2.day2",
+        "solve",
+        {},
+        {"day2/day2-example.txt": {}, "day2/day2.txt": {}},
+    ),
+    Solver(
+        3,
+        "1",
+        "day3.day3",
+        "solve_part1",
+        {},
+        {"day3/day3-example.txt": {}, "day3/day3.txt": {}},
+    ),
+    Solver(
+        3,
+        "2",
+        "day3.day3",
+        "solve_part2",
+        {"group_size": 3},
+        {"day3/day3-example.txt": {}, "day3/day3.txt": {}},
+    ),
+    Solver(
+        4,
+        "both",
+        "day4.day4",
+        "solve",
+        {},
+        {"day4/day4-example.txt": {}, "day4/day4.txt": {}},
+    ),
+    Solver(
+        5,
+        "1",
+        "day5.day5",
+        "solve",
+        {"is_crate_mover_9001": False},
+        {"day5/day5-example.txt": {}, "day5/day5.txt": {}},
+    ),
+    Solver(
+        5,
+        "2",
+        "day5.day5",
+        "solve",
+        {"is_crate_mover_9001": True},
+        {"day5/day5-example.txt": {}, "day5/day5.txt": {}},
+    ),
+    Solver(
+        6,
+        "both",
+        "day6.day6",
+        "solve",
+        {},
+        {"day6/day6-example.txt": {}, "day6/day6.txt": {}},
+    ),
+    Solver(
+        7,
+        "both",
+        "day7.day7",
+        "solve",
+        {"capacity": 70000000, "required": 30000000},
+        {"day7/day7-example.txt": {}, "day7/day7.txt": {}},
+    ),
+    Solver(
+        8,
+        "both",
+        "day8.day8",
+        "solve",
+        {},
+        {"day8/day8-example.txt": {}, "day8/day8.txt": {}},
+    ),
+    Solver(
+        9,
+        "1",
+        "day9.day9",
+        "solve",
+        {"num_knots": 2},
+        {"day9/day9-example.txt": {}, "day9/day9.txt": {}},
+    ),
+    Solver(
+        9,
+        "2",
+        "day9.day9",
+        "solve",
+        {"num_knots": 10},
+        {
+            "day9/day9-example.txt": {},
+            "day9/day9-example1.txt": {},
+            "day9/day9.txt": {},
+        },
+    ),
+    Solver(
+        10,
+        "both",
+        "day10.day10",
+        "solve",
+        {},
+        {
+            "day10/day10-example1.txt": {},
+            "day10/day10-example2.txt": {},
+            "day10/day10.txt": {},
+        },
+    ),
+    Solver(
+        11,
+        "1",
+        "day11.day11",
+        "solve",
+        {"worry_drop": 3, "num_rounds": 20},
+        {"day11/day11-example.txt": {}, "day11/day11.txt": {}},
+    ),
+    Solver(
+        11,
+        "2",
+        "day11.day11",
+        "solve",
+        {"worry_drop": 1, "num_rounds": 10000},
+        {"day11/day11-example.txt": {}, "day11/day11.txt": {}},
+    ),
+    Solver(
+        12,
+        "1",
+        "day12.day12",
+        "solve",
+        {"part2": False},
+        {"day12/day12-example.txt": {}, "day12/day12.txt": {}},
+    ),
+    Solver(
+        12,
+        "2",
+        "day12.day12",
+        "solve",
+        {"part2": True},
+        {"day12/day12-example.txt": {}, "day12/day12.txt": {}},
+    ),
+    Solver(13, "both", "day13.day13", "solve", {}, {}),
+    Solver(
+        14,
+        "1",
+        "day14.day14",
+        "solve",
+        {},
+        {"day14/day14-example.txt": {}, "day14/day14.txt": {}},
+    ),
+    Solver(
+        14,
+        "2",
+        "day14.day14p2",
+        "solve",
+        {},
+        {"day14/day14-example.txt": {}, "day14/day14.txt": {}},
+    ),
+    Solver(
+        15,
+        "1",
+        "day15.day15",
+        "solve",
+        {"target_row": 10},
+        {"day15/day15-example.txt": {}, "day15/day15.txt": {"target_row": 2000000}},
+    ),
+    Solver(
+        15,
+        "2",
+        "day15.day15p2",
+        "solve",
+        {"min_coord": 0, "max_coord": 4000000, "engine": "native"},
+        {"day15/day15-example.txt": {"max_coord": 20}, "day15/day15.txt": {}},
+    ),
+]
+
+
+def find_solver(day: int, part: str) -> Solver:
+    """
+    Look up the entry point for a day and part. A solver registered for
+    "both" parts answers a request for either part.
+    Params:
+        day: puzzle day number
+        part: "1", "2" or "both"
+    Returns: the matching Solver
+    """
+    fallback: Optional[Solver] = None
+    for solver in SOLVERS:
+        if solver.day != day:
+            continue
+        if solver.part == part:
+            return solver
+        if solver.part == "both":
+            fallback = solver
+    if fallback is None:
+        raise KeyError(f"No solver registered for day {day} part {part}")
+    return fallback
+
+
+def load(solver: Solver) -> Tuple[ModuleType, Callable[..., Result]]:
+    """
+    Import the solver module
+    Params:
+        solver: entry point to load
+    Returns: the module and its solve function
+    """
+    module = importlib.import_module(solver.module)
+    return module, getattr(module, solver.solve)
+
+
+def preload() -> Dict[str, str]:
+    """
+    Import every solver module up front
+    Returns: modules that failed to import, mapped to the reason
+    """
+    failures: Dict[str, str] = {}
+    for solver in SOLVERS:
+        try:
+            importlib.import_module(solver.module)
+        except ImportError as err:
+            failures[solver.module] = str(err)
+    return failures
+
+
+def run(
+    solver: Solver, lines: Iterable[str], params: Optional[Dict[str, Any]] = None
+) -> Result:
+    """
+    Parse and solve a single input
+    Params:
+        solver: entry point to run
+        lines: input lines
+        params: overrides for the solver's default parameters
+    Returns: the solver's result dictionary
+    """
+    module, solve = load(solver)
+    return solve(module.parse(lines), **{**solver.params, **(params or {})})
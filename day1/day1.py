@@ -1,34 +1,359 @@
 """
 AOC 2022 Day 1 solution
 """
+import argparse as ap
+import concurrent.futures
+import heapq
+import itertools
+import mmap
+import os
+import re
 import sys
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    TextIO,
+    Tuple,
+    Union,
+)
 
+# numpy is optional, so only the numpy engine loads it
+if TYPE_CHECKING:
+    import numpy as np
 
-def main(fname: str) -> None:
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoclib import log, profiling, reader  # pylint: disable=wrong-import-position
+
+LOG = log.get_logger(__name__)
+
+# a blank line between two elves' records
+RECORD_BREAK_RE = re.compile(rb"\n[ \t\r]*\n")
+
+# byte ranges per worker in parallel mode, so a worker that finishes a
+# range early picks up another rather than idling
+CHUNKS_PER_WORKER = 4
+
+
+class RankedElf(NamedTuple):
+    """
+    An elf among the top calorie carriers
+    rank: 1 for the elf carrying the most
+    elf: position of the elf in the input, starting at 1
+    calories: calories carried
+    """
+
+    rank: int
+    elf: int
+    calories: int
+
+
+def parse(lines: Iterable[str]) -> Iterator[int]:
+    """
+    Total the calories carried by each elf
+    Params:
+        lines: input lines - one calorie count per line, blank line between elves
+    Returns: iterator over the calorie total for each elf in input order
+    """
+    for record in reader.records(lines):
+        yield sum(int(line) for line in record)
+
+
+def top_k(elf_totals: Iterable[int], top: int) -> List[RankedElf]:
+    """
+    Keep the top elves while the totals stream past
+    Params:
+        elf_totals: calorie total for each elf in input order
+        top: number of elves to keep
+    Returns: the top elves, most calories first. Ties keep the earlier elf.
+    """
+    return select_top(zip(elf_totals, itertools.count(1)), top)
+
+
+def select_top(candidates: Iterable[Tuple[int, int]], top: int) -> List[RankedElf]:
+    """
+    Keep the top elves in a bounded min-heap, so memory is O(top) however
+    many candidates there are
+    Params:
+        candidates: (calories, elf) for each elf, in any order
+        top: number of elves to keep
+    Returns: the top elves, most calories first. Ties keep the earlier elf.
+    """
+    # (calories, -elf) orders a later elf below an earlier one on a tie
+    heap: List[Tuple[int, int]] = []
+    for calories, elf in candidates:
+        if len(heap) < top:
+            heapq.heappush(heap, (calories, -elf))
+        elif heap and (calories, -elf) > heap[0]:
+            heapq.heapreplace(heap, (calories, -elf))
+    return [
+        RankedElf(rank, -neg_elf, calories)
+        for rank, (calories, neg_elf) in enumerate(sorted(heap, reverse=True), 1)
+    ]
+
+
+def report(ranked: List[RankedElf]) -> Dict[str, Any]:
+    """
+    Log and return the top elves
+    Params:
+        ranked: the top elves, most calories first
+    Returns: the top totals, the elves carrying them and their sum
+    """
+    best = [ranked_elf.calories for ranked_elf in ranked]
+    for ranked_elf in ranked:
+        LOG.debug(
+            "Rank %d: elf %d carries %d",
+            ranked_elf.rank,
+            ranked_elf.elf,
+            ranked_elf.calories,
+        )
+    LOG.info("Totals: %s sum %d", best, sum(best))
+    return {
+        "totals": best,
+        "elves": [ranked_elf.elf for ranked_elf in ranked],
+        "sum": sum(best),
+    }
+
+
+def solve(elf_totals: Iterable[int], top: int = 3) -> Dict[str, Any]:
+    """
+    Find the elves carrying the most calories
+    Params:
+        elf_totals: calorie total for each elf
+        top: number of elves to report
+    Returns: the top totals, the elves carrying them and their sum
+    """
+    return report(top_k(elf_totals, top))
+
+
+def chunk_bounds(data: Union[bytes, mmap.mmap], chunks: int) -> List[Tuple[int, int]]:
+    """
+    Split an input into byte ranges that each end on a blank line, so no
+    elf's record straddles two ranges
+    Params:
+        data: the input, typically memory mapped
+        chunks: number of ranges wanted
+    Returns: (start, end) of each range, fewer than chunks if the records
+    are too few or too large to split that finely
+    """
+    bounds: List[Tuple[int, int]] = []
+    start = 0
+    for i in range(1, chunks):
+        match = RECORD_BREAK_RE.search(data, max(start, len(data) * i // chunks))
+        if not match:
+            break
+        bounds.append((start, match.end()))
+        start = match.end()
+    if start < len(data):
+        bounds.append((start, len(data)))
+    return bounds
+
+
+def range_lines(infile: BinaryIO, start: int, end: int) -> Iterator[str]:
+    """
+    Yield the lines of one byte range of a file, one at a time
+    Params:
+        infile: file opened in binary mode
+        start: offset of the first byte of the range, at the start of a line
+        end: offset just past the range, at the start of a line
+    Returns: iterator over the decoded lines
+    """
+    infile.seek(start)
+    position = start
+    while position < end:
+        line = infile.readline()
+        if not line:
+            return
+        position += len(line)
+        yield line.decode("utf-8")
+
+
+def chunk_top_k(
+    fname: str, start: int, end: int, top: int
+) -> Tuple[int, List[RankedElf]]:
+    """
+    Find the top elves in one byte range of the input, in a worker process.
+    The range is streamed a line at a time, so memory stays O(top).
+    Params:
+        fname: input filename
+        start: offset of the first byte of the range
+        end: offset just past the range
+        top: number of elves to keep
+    Returns: number of elves in the range and the top elves, numbered from 1
+    within the range
+    """
+    with open(fname, "rb") as infile:
+        counter = itertools.count(1)
+        # zip stops on the exhausted totals before drawing from the counter,
+        # so the counter's next value is one past the last elf
+        ranked = select_top(zip(parse(range_lines(infile, start, end)), counter), top)
+    return next(counter) - 1, ranked
+
+
+def parallel_top_k(fname: str, top: int, workers: int) -> List[RankedElf]:
+    """
+    Find the top elves of a large input across a process pool. The input is
+    split on blank lines into several ranges per worker, each range is
+    ranked in a worker and the per-range winners are merged.
+    Params:
+        fname: input filename
+        top: number of elves to keep
+        workers: number of worker processes
+    Returns: the top elves, numbered from 1 across the whole input
+    """
+    with open(fname, "rb") as infile:
+        size = os.fstat(infile.fileno()).st_size
+        if not size:
+            return []
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            bounds = chunk_bounds(data, workers * CHUNKS_PER_WORKER)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(
+            chunk_top_k,
+            itertools.repeat(fname),
+            [start for start, _end in bounds],
+            [end for _start, end in bounds],
+            itertools.repeat(top),
+        )
+        candidates: List[Tuple[int, int]] = []
+        first_elf = 0
+        for elves, ranked in results:
+            candidates.extend(
+                (ranked_elf.calories, first_elf + ranked_elf.elf)
+                for ranked_elf in ranked
+            )
+            first_elf += elves
+    return select_top(candidates, top)
+
+
+def numpy_totals(data: bytes) -> "np.ndarray":
+    """
+    Total each elf's calories from the raw input with array operations
+    rather than a Python loop per line. The lines are read as right aligned
+    columns of digits, one column at a time across every line, and runs of
+    lines with no blank line between them are summed per elf.
+    Params:
+        data: the whole input
+    Returns: calorie total for each elf in input order
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    raw = np.frombuffer(data, dtype=np.uint8)
+    newlines = np.flatnonzero(raw == ord("\n"))
+    ends = newlines
+    if raw.size and raw[-1] != ord("\n"):
+        ends = np.append(newlines, raw.size)
+    starts = np.concatenate(([0], newlines + 1))[: ends.size]
+    # leave out a carriage return before the newline
+    ends = ends - ((ends > starts) & (raw[np.maximum(ends - 1, 0)] == ord("\r")))
+
+    values = np.zeros(ends.size, dtype=np.int64)
+    has_digit = np.zeros(ends.size, dtype=bool)
+    for column in range(int((ends - starts).max(initial=0)), 0, -1):
+        index = ends - column
+        # bytes below "0" wrap around to large values and are not digits
+        digit = raw[np.maximum(index, 0)] - ord("0")
+        present = (index >= starts) & (digit <= 9)
+        # only a digit shifts the value, so trailing spaces are ignored the
+        # way int() ignores them
+        values = np.where(present, values * 10 + digit, values)
+        has_digit |= present
+
+    lines = np.flatnonzero(has_digit)
+    if not lines.size:
+        return np.zeros(0, dtype=np.int64)
+    # a gap in the numbers of the lines holding values is a blank line,
+    # which starts a new elf
+    elf_starts = np.flatnonzero(np.diff(lines, prepend=-2) > 1)
+    return np.add.reduceat(values[lines], elf_starts)
+
+
+def numpy_top_k(elf_totals: "np.ndarray", top: int) -> List[RankedElf]:
+    """
+    Rank the elves from an array of totals
+    Params:
+        elf_totals: calorie total for each elf in input order
+        top: number of elves to keep
+    Returns: the top elves, most calories first. Ties keep the earlier elf.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    order = np.argsort(-elf_totals, kind="stable")[:top]
+    return [
+        RankedElf(rank, int(index) + 1, int(elf_totals[index]))
+        for rank, index in enumerate(order, 1)
+    ]
+
+
+def run_numpy(data: bytes, top: int) -> Dict[str, Any]:
+    """
+    Solve a raw input with the numpy engine
+    """
+    with profiling.phase("parse"):
+        elf_totals = numpy_totals(data)
+    with profiling.phase("solve"):
+        return report(numpy_top_k(elf_totals, top))
+
+
+def run(infile: TextIO, top: int) -> Dict[str, Any]:
+    """
+    Solve an open input
+    """
+    with profiling.phase("parse"):
+        parsed = parse(infile)
+    with profiling.phase("solve"):
+        return solve(parsed, top)
+
+
+def main(
+    fname: str, top: int = 3, workers: int = 1, engine: str = "python"
+) -> Dict[str, Any]:
     """
     Part 2 Main
+    Params:
+        fname: input filename, or - to read stdin
+        top: number of elves to report
+        workers: split the file across this many processes when above 1
+        engine: python to stream the lines, numpy to parse the whole input
+        with array operations
     """
+    if engine == "numpy":
+        if fname == "-":
+            return run_numpy(sys.stdin.buffer.read(), top)
+        with open(fname, "rb") as infile:
+            return run_numpy(infile.read(), top)
+    if workers > 1:
+        with profiling.phase("solve"):
+            return report(parallel_top_k(fname, top, workers))
+    if fname == "-":
+        return run(sys.stdin, top)
     with open(fname, "r", encoding="utf-8") as infile:
-        lines = infile.readlines()
-
-        elf_totals = []
-        total = 0
-        index = 1
-        for line in lines:
-            try:
-                cval = int(line)
-                total += cval
-            except ValueError:
-                elf_totals.append(total)
-                elf_totals = sorted(elf_totals, reverse=True)[:3]
-                index += 1
-                total = 0
-        if total > 0:
-            elf_totals.append(total)
-            elf_totals = sorted(elf_totals, reverse=True)[:3]
-
-        print(f"Totals: {elf_totals} sum {sum(elf_totals)}")
+        return run(infile, top)
 
 
 if __name__ == "__main__":
-    main(sys.argv[1])
+    parser = ap.ArgumentParser()
+    parser.add_argument("filename", nargs="?", default="-", help="- reads stdin")
+    parser.add_argument("--top", default=3, type=int)
+    parser.add_argument(
+        "--workers", default=1, type=int, help="split a large file across processes"
+    )
+    parser.add_argument("--engine", choices=["python", "numpy"], default="python")
+    log.add_arguments(parser)
+    profiling.add_arguments(parser)
+    args = parser.parse_args()
+    if args.top < 1:
+        parser.error("--top must be at least 1")
+    if args.workers > 1 and args.filename == "-":
+        parser.error("--workers needs a filename, not stdin")
+    if args.workers > 1 and args.engine == "numpy":
+        parser.error("--workers runs the python engine only")
+    log.setup(args.verbose)
+    with profiling.profile(args.profile, args.profile_top):
+        main(args.filename, args.top, args.workers, args.engine)
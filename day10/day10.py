@@ -2,9 +2,16 @@
 Python solution for Advent of Code 2022 Day 10
 """
 import argparse as ap
-from typing import List, Union
+import os
+import sys
+from typing import Any, Dict, Iterable, List, Union
 from dataclasses import dataclass
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoclib import log, profiling, reader  # pylint: disable=wrong-import-position
+
+LOG = log.get_logger(__name__)
+
 @dataclass
 class NoopInstruction:
     """
@@ -111,24 +118,50 @@ class StateMachine:
         return total
 
 
-def main(fname: str) -> None:
+def parse(lines: Iterable[str]) -> List[Instruction]:
+    """
+    Convert the input lines into a program
+    Params:
+        lines: input lines
+    Return: list of instructions
+    """
+    return [build_instruction(line.rstrip()) for line in reader.lines(lines)]
+
+
+def solve(program: List[Instruction]) -> Dict[str, Any]:
+    """
+    Run the program for parts1 and 2
+    Params:
+        program: list of instructions
+    Return: part1 signal strength total and the CRT image
+    """
+    machine = StateMachine(program)
+    result = machine.run([20, 60, 100, 140, 180, 220])
+    LOG.info("Part1 Solution: %d", result)
+    LOG.info("%s", machine.display())
+    return {"part1": result, "crt": machine.display()}
+
+
+def main(fname: str) -> Dict[str, Any]:
     """
     Execute the day10 solution for parts1 and 2
     Params:
         fname: input filename
-    Return: None
+    Return: part1 signal strength total and the CRT image
     """
     with open(fname, "r", encoding="utf-8") as infile:
-        lines = [line.rstrip() for line in infile.readlines()]
-        program = [build_instruction(line) for line in lines]
-        machine = StateMachine(program)
-        result = machine.run([20, 60, 100, 140, 180, 220])
-        print(f"Part1 Solution: {result}")
-        print(machine.display())
+        with profiling.phase("parse"):
+            parsed = parse(infile)
+        with profiling.phase("solve"):
+            return solve(parsed)
 
 
 if __name__ == "__main__":
     parser = ap.ArgumentParser()
     parser.add_argument("filename")
+    log.add_arguments(parser)
+    profiling.add_arguments(parser)
     args = parser.parse_args()
-    main(args.filename)
+    log.setup(args.verbose)
+    with profiling.profile(args.profile, args.profile_top):
+        main(args.filename)
@@ -2,10 +2,17 @@
 Advent of Code 2022 Day 11 Python solution
 """
 import argparse as ap
+import os
+import sys
 from dataclasses import dataclass
-from typing import List, Tuple, Dict
+from typing import Dict, Iterable, List, Tuple
 import re
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoclib import log, profiling, reader  # pylint: disable=wrong-import-position
+
+LOG = log.get_logger(__name__)
+
 Expression = str
 
 
@@ -146,13 +153,13 @@ def parse_monkey(lines: List[str]) -> Tuple[int, Monkey]:
     """
     Parse all of the data associated with a given monkey
     Params:
-        lines: All lines in the program
+        lines: the lines describing one monkey
     Returns: tuple of monkey id, monkey
     """
     monkey_id_re = re.compile(r"Monkey (\d+):")
     match = monkey_id_re.findall(lines[0])
     assert match
-    monkey_id = int(match[0][0])
+    monkey_id = int(match[0])
 
     starting_items = parse_starting_items(lines[1:])
     worry_operation = parse_worry_operation(lines[2:])
@@ -160,44 +167,70 @@ def parse_monkey(lines: List[str]) -> Tuple[int, Monkey]:
     return monkey_id, Monkey(starting_items, worry_operation, test_operation)
 
 
-def main(fname: str, worry_drop: int, num_rounds: int) -> None:
+def parse(lines: Iterable[str]) -> Dict[int, Monkey]:
+    """
+    Parse every monkey in the program
+    Params:
+        lines: input lines
+    Returns: Dictionary mapping monkey ids to monkey objects
+    """
+    monkey_holdings: Dict[int, Monkey] = {}
+    for record in reader.records(lines):
+        monkey_id, monkey = parse_monkey(record)
+        monkey_holdings[monkey_id] = monkey
+    return monkey_holdings
+
+
+def solve(
+    monkey_holdings: Dict[int, Monkey], worry_drop: int, num_rounds: int
+) -> Dict[str, int]:
+    """
+    Run the monkeys through every round and measure the monkey business
+    Params:
+        monkey_holdings: Dictionary mapping monkey ids to monkey objects
+        worry_drop: Divisor indicating the drop in worry over monkey inspection
+        num_rounds: The number of rounds to monitor
+    Returns: inspection counts of the two most active monkeys and their product
+    """
+    test_prod = 1
+    for monkey in monkey_holdings.values():
+        test_prod *= monkey.test_operation.divisor
+
+    monkeys = sorted(list(monkey_holdings.keys()))
+    for _inspection_round in range(1, num_rounds + 1):
+        for monkey_id in monkeys:
+            monkey_holdings[monkey_id].inspect(monkey_holdings, worry_drop, test_prod)
+    inspections = sorted(
+        [monkey_holdings[monkey_id].total_inspections for monkey_id in monkeys],
+        reverse=True,
+    )
+    LOG.info(
+        "Most active %d second %d Part 1 Result %d",
+        inspections[0],
+        inspections[1],
+        inspections[0] * inspections[1],
+    )
+    return {
+        "most_active": inspections[0],
+        "second": inspections[1],
+        "monkey_business": inspections[0] * inspections[1],
+    }
+
+
+def main(fname: str, worry_drop: int, num_rounds: int) -> Dict[str, int]:
     """
     Main function for Day11
     Params:
         fname: python
         worry_drop: Divisor indicating the drop in worry over monkey inspection
         num_rounds: The number of rounds to monitor
-    Returns: None
+    Returns: inspection counts of the two most active monkeys and their product
     """
     with open(fname, "r", encoding="utf-8") as infile:
-        lines = [line.rstrip("\n") for line in infile.readlines()]
-        i = 0
-        monkey_holdings: Dict[int, Monkey] = {}
-        test_prod = 1
-        while i < len(lines):
-            if lines[i]:
-                monkey_id, monkey = parse_monkey(lines[i:])
-                monkey_holdings[monkey_id] = monkey
-                test_prod *= monkey.test_operation.divisor
-                i += 6
-            else:
-                i += 1
-
-        monkeys = sorted(list(monkey_holdings.keys()))
-        for _inspection_round in range(1, num_rounds + 1):
-            for monkey_id in monkeys:
-                monkey_holdings[monkey_id].inspect(
-                    monkey_holdings, worry_drop, test_prod
-                )
-        inspections = sorted(
-            [monkey_holdings[monkey_id].total_inspections for monkey_id in monkeys],
-            reverse=True,
-        )
-        print(
-            f"Most active {inspections[0]} "
-            f"second {inspections[1]} "
-            f"Part 1 Result {inspections[0]*inspections[1]}"
-        )
+        with profiling.phase("parse"):
+            parsed = parse(infile)
+        with profiling.phase("solve"):
+            return solve(parsed, worry_drop, num_rounds)
 
 
 if __name__ == "__main__":
@@ -205,5 +238,9 @@ if __name__ == "__main__":
     parser.add_argument("filename")
     parser.add_argument("--worry-drop", default=3, type=int)
     parser.add_argument("--num-rounds", default=20, type=int)
+    log.add_arguments(parser)
+    profiling.add_arguments(parser)
     args = parser.parse_args()
-    main(args.filename, args.worry_drop, args.num_rounds)
+    log.setup(args.verbose)
+    with profiling.profile(args.profile, args.profile_top):
+        main(args.filename, args.worry_drop, args.num_rounds)
@@ -2,10 +2,17 @@
 Advent of Code 2022 Day 12
 """
 import argparse
+import os
+import sys
 from dataclasses import dataclass
-from typing import List, Dict, Tuple
+from typing import Dict, Iterable, List, Sequence, Tuple
 from collections import deque
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoclib import log, profiling, reader  # pylint: disable=wrong-import-position
+
+LOG = log.get_logger(__name__)
+
 Position = tuple[int, int]
 
 
@@ -25,7 +32,7 @@ StartNodes = List[Node]
 EndNode = Node
 
 
-def best_trail(graph: Graph, potential_starts: StartNodes, end: EndNode) -> None:
+def best_trail(graph: Graph, potential_starts: StartNodes, end: EndNode) -> int:
     """
     Find the best trail given an elevation graph, a list of potential starting
     points for the trail, and the desired end point.
@@ -34,7 +41,7 @@ def best_trail(graph: Graph, potential_starts: StartNodes, end: EndNode) -> None
         graph: Dict[Position, Node]
         potential_starts: list of potential starting nodes (height 'a')
         end: desired end node
-    Returns: None
+    Returns: number of moves from the best start
     """
 
     best_moves = -1
@@ -49,7 +56,7 @@ def best_trail(graph: Graph, potential_starts: StartNodes, end: EndNode) -> None
         while my_queue:
             next_node, moves = my_queue.popleft()
             if next_node.position == end.position:
-                print(f"Found end position: moves {moves} from start {start}")
+                LOG.debug("Found end position: moves %d from start %s", moves, start)
                 if moves < best_moves or best_moves < 0:
                     best_moves = moves
                     best_start = start
@@ -60,18 +67,22 @@ def best_trail(graph: Graph, potential_starts: StartNodes, end: EndNode) -> None
                 visited.append(edge)
                 my_queue.append((graph[edge], moves + 1))
     assert best_start is not None
-    print(f"Best Moves {best_moves} from starting position {best_start}")
+    LOG.info("Best Moves %d from starting position %s", best_moves, best_start)
+    return best_moves
 
 
-HEIGHT_MAP = {"S": ord("a"), "E": ord("z")}
+HEIGHT_MAP = {ord("S"): ord("a"), ord("E"): ord("z")}
 
 
-def build_nodes(lines: List[str], part2: bool) -> Tuple[Graph, StartNodes, EndNode]:
+def build_nodes(
+    lines: Iterable[Sequence[int]], part2: bool
+) -> Tuple[Graph, StartNodes, EndNode]:
     """
     Create all nodes from the text input
 
     Params:
-        lines: list of strings defining the heights of all positions
+        lines: rows of character codes, either bytes or rows indexed straight
+            from a memory mapped input, defining the heights of all positions
         part2: consider multiple possible starting points
     Returns:
         Tuple of node graph, list of starting nodes, and the end node
@@ -81,11 +92,11 @@ def build_nodes(lines: List[str], part2: bool) -> Tuple[Graph, StartNodes, EndNo
     graph: Graph = {}
     for i, line in enumerate(lines):
         for j, my_char in enumerate(line):
-            height = HEIGHT_MAP.get(my_char, ord(my_char))
+            height = HEIGHT_MAP.get(my_char, my_char)
             graph[(i, j)] = Node(height, (i, j), [])
-            if my_char == "E":
+            if my_char == ord("E"):
                 end = graph[(i, j)]
-            if (part2 and graph[(i, j)].height == ord("a")) or my_char == "S":
+            if (part2 and graph[(i, j)].height == ord("a")) or my_char == ord("S"):
                 all_starts.append(graph[(i, j)])
     assert end is not None
     return graph, all_starts, end
@@ -102,7 +113,7 @@ def build_edges(graph: Graph) -> None:
     num_rows = max(position[0] for position in graph.keys()) + 1
     num_cols = max(position[1] for position in graph.keys()) + 1
 
-    print(f"Num rows {num_rows} Cols {num_cols}")
+    LOG.debug("Num rows %d Cols %d", num_rows, num_cols)
 
     for i in range(num_rows):
         for j in range(num_cols):
@@ -125,34 +136,89 @@ def build_edges(graph: Graph) -> None:
                     graph[(i, j)].edges.append(prev_col)
 
 
-def main(fname: str, part2: bool) -> None:
+def parse(lines: Iterable[str]) -> Tuple[Graph, StartNodes, EndNode]:
     """
-    Program entry
+    Build the elevation graph, including its edges, from the text input
 
     Params:
-        fname: filename
+        lines: input lines
+    Returns:
+        Tuple of node graph, list holding the 'S' start node, and the end node
+    """
+    return build_terrain(line.encode() for line in reader.lines(lines))
+
+
+def build_terrain(
+    rows: Iterable[Sequence[int]],
+) -> Tuple[Graph, StartNodes, EndNode]:
+    """
+    Build the elevation graph, including its edges, from rows of heights
+
+    Params:
+        rows: rows of character codes defining the heights of all positions
+    Returns:
+        Tuple of node graph, list holding the 'S' start node, and the end node
+    """
+    graph, all_starts, end = build_nodes(rows, False)
+    build_edges(graph)
+    return graph, all_starts, end
+
+
+def solve(
+    terrain: Tuple[Graph, StartNodes, EndNode], part2: bool
+) -> Dict[str, int]:
+    """
+    Find the fewest moves to the end node
+
+    Params:
+        terrain: graph, start nodes and end node returned by parse
         part2: Search for the best starting point from all possible
     Returns:
-        None
+        Number of moves along the best trail
     """
-    with open(fname, "r", encoding="utf-8") as infile:
-        graph: Dict[Position, Node] = {}
+    graph, all_starts, end = terrain
+    if part2:
+        all_starts = [node for node in graph.values() if node.height == ord("a")]
+    return {"moves": best_trail(graph, all_starts, end)}
 
-        all_starts: List[Node] = []
-        end = None
-        lines = [line.rstrip("\n") for line in infile.readlines()]
-        graph, all_starts, end = build_nodes(lines, part2)
 
-        assert end is not None
+def main(fname: str, part2: bool, use_mmap: bool = False) -> Dict[str, int]:
+    """
+    Program entry
 
-        build_edges(graph)
-        best_trail(graph, all_starts, end)
+    Params:
+        fname: filename
+        part2: Search for the best starting point from all possible
+        use_mmap: read the rows straight from a memory map of the file
+    Returns:
+        Number of moves along the best trail
+    """
+    if use_mmap:
+        with reader.MappedInput(fname) as mapped:
+            with profiling.phase("parse"):
+                parsed = build_terrain(mapped.lines())
+            with profiling.phase("solve"):
+                result = solve(parsed, part2)
+            # drop the terrain before the mapping its rows were read from
+            del parsed
+        return result
+    with open(fname, "r", encoding="utf-8") as infile:
+        with profiling.phase("parse"):
+            parsed = parse(infile)
+        with profiling.phase("solve"):
+            return solve(parsed, part2)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("filename")
     parser.add_argument("--part2", action="store_true")
+    parser.add_argument(
+        "--mmap", action="store_true", help="memory map the input instead of reading it"
+    )
+    log.add_arguments(parser)
+    profiling.add_arguments(parser)
     args = parser.parse_args()
-
-    main(args.filename, args.part2)
+    log.setup(args.verbose)
+    with profiling.profile(args.profile, args.profile_top):
+        main(args.filename, args.part2, args.mmap)
@@ -3,8 +3,14 @@ Advent of Code Day 13
 """
 import argparse
 import ast
-from typing import Union, List, Any
-import functools
+import os
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoclib import log, profiling, reader  # pylint: disable=wrong-import-position
+
+LOG = log.get_logger(__name__)
 
 LESS = -1
 EQUAL = 0
@@ -62,45 +68,74 @@ def compare(val1: Union[List[Any], int], val2: Union[List[Any], int]) -> int:
     return compare([val1], val2)
 
 
-def main(fname: str) -> None:
+Packet = Union[List[Any], int]
+
+
+def parse(lines: Iterable[str]) -> Iterator[Tuple[Packet, Packet]]:
+    """
+    Read the packet pairs
+    Params:
+        lines: input lines, pairs of packets separated by a blank line
+    Returns: iterator over (left, right) packet pairs
+    """
+    for record in reader.records(lines):
+        yield ast.literal_eval(record[0]), ast.literal_eval(record[1])
+
+
+def solve(pairs: Iterable[Tuple[Packet, Packet]]) -> Dict[str, int]:
+    """
+    Count the pairs already in order and find the decoder key. The divider
+    packets' positions in the sorted list are one past the number of
+    packets ordered before them, so no packets need to be kept for part 2.
+    Params:
+        pairs: (left, right) packet pairs
+    Returns: in order pair count, index sum and the part 2 decoder key
+    """
+    proper_order = 0
+    index_sum = 0
+    first_divider: Packet = [[2]]
+    second_divider: Packet = [[6]]
+    # sorted positions of the dividers, [[2]] sorting before [[6]]
+    first_position = 1
+    second_position = 2
+    debug = LOG.isEnabledFor(log.DEBUG)
+    for pair_index, (left_packet, right_packet) in enumerate(pairs, 1):
+        result = compare(left_packet, right_packet)
+        if debug:
+            LOG.debug("Compare %s vs %s result %d", left_packet, right_packet, result)
+        if result == LESS:
+            proper_order += 1
+            index_sum += pair_index
+        for packet in (left_packet, right_packet):
+            if compare(packet, first_divider) != GREATER:
+                first_position += 1
+            if compare(packet, second_divider) != GREATER:
+                second_position += 1
+
+    LOG.info("Number of in order pairs: %d", proper_order)
+    LOG.info("Index sum %d", index_sum)
+    result = first_position * second_position
+    LOG.info("Part 2: %d", result)
+    return {"in_order": proper_order, "index_sum": index_sum, "decoder_key": result}
+
+
+def main(fname: str) -> Dict[str, int]:
     """
     Program entry
     """
     with open(fname, "r", encoding="utf-8") as infile:
-        lines = infile.readlines()
-        proper_order = 0
-        index_sum = 0
-        i = 0
-        pair_index = 1
-        packets: List[Union[List[Any], int]] = []
-        while i < len(lines) - 1:
-            left_packet = ast.literal_eval(lines[i])
-            right_packet = ast.literal_eval(lines[i + 1])
-            result = compare(left_packet, right_packet)
-            print(f"Compare {left_packet} vs {right_packet} result {result}")
-            if result == LESS:
-                proper_order += 1
-                index_sum += pair_index
-            packets.append(left_packet)
-            packets.append(right_packet)
-            i += 3
-            pair_index += 1
-
-        print(f"Number of in order pairs: {proper_order}")
-        print(f"Index sum {index_sum}")
-        packets.append([[2]])
-        packets.append([[6]])
-        packets = sorted(packets, key=functools.cmp_to_key(compare))
-
-        result = 1
-        for i, packet in enumerate(packets):
-            if packet in ([[2]], [[6]]):
-                result *= i + 1
-        print(f"Part 2: {result}")
+        with profiling.phase("parse"):
+            parsed = parse(infile)
+        with profiling.phase("solve"):
+            return solve(parsed)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("filename", type=str)
+    log.add_arguments(parser)
+    profiling.add_arguments(parser)
     args = parser.parse_args()
-    main(args.filename)
+    log.setup(args.verbose)
+    with profiling.profile(args.profile, args.profile_top):
+        main(args.filename)
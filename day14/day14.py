@@ -1,7 +1,14 @@
 import argparse
-from typing import List, Tuple, NamedTuple, Optional
+import os
+import sys
+from typing import Dict, Iterable, List, Tuple, NamedTuple, Optional
 from dataclasses import dataclass, field
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoclib import log, profiling, reader  # pylint: disable=wrong-import-position
+
+LOG = log.get_logger(__name__)
+
 
 class RockEndpoint(NamedTuple):
     row: int
@@ -81,7 +88,7 @@ class CaveMap:
         return self.is_horizontal_rock(row, col) or self.is_vertical_rock(row, col)
 
     def draw(self) -> str:
-        print(self.display)
+        LOG.debug("%s", self.display)
 
         display_list: List[str] = []
         for record in self.display:
@@ -106,7 +113,7 @@ class CaveMap:
             self.horizontal_lines.append(rock_line)
             return
 
-        print(self)
+        LOG.debug("%s", self)
         self.vertical_lines.append(rock_line)
 
     def add_rock_structure(self, line: str) -> None:
@@ -149,12 +156,12 @@ class CaveMap:
         return True
 
 
-def build_map(lines: List[str]) -> CaveMap:
+def build_map(lines: Iterable[str]) -> CaveMap:
     """
     Convert the input text into a map of the cave
 
     Params:
-        lines: list of strings defining routes
+        lines: strings defining routes
 
     Returns:
         Representation of the cave
@@ -164,7 +171,7 @@ def build_map(lines: List[str]) -> CaveMap:
         cave_map.add_rock_structure(line)
 
     cave_map.init_map()
-    print(cave_map.draw())
+    LOG.debug("%s", log.lazy(cave_map.draw))
     return cave_map
 
 
@@ -184,23 +191,36 @@ def drop_sand(cave_map: CaveMap) -> bool:
     return cave_map.fall(0, 500)
 
 
-def main(filename: str) -> None:
-    with open(filename, "r", encoding="utf-8") as infile:
-        lines = [line.rstrip("\n") for line in infile.readlines()]
-        cave_map = build_map(lines)
+def parse(lines: Iterable[str]) -> CaveMap:
+    return build_map(reader.lines(lines))
+
 
-        sand_drops = 0
-        while True:
-            if not drop_sand(cave_map):
-                break
-            sand_drops += 1
+def solve(cave_map: CaveMap) -> Dict[str, int]:
+    sand_drops = 0
+    while True:
+        if not drop_sand(cave_map):
+            break
+        sand_drops += 1
 
-        print(cave_map.draw())
-        print(f"Number of drops: {sand_drops}")
+    LOG.debug("%s", log.lazy(cave_map.draw))
+    LOG.info("Number of drops: %d", sand_drops)
+    return {"drops": sand_drops}
+
+
+def main(filename: str) -> Dict[str, int]:
+    with open(filename, "r", encoding="utf-8") as infile:
+        with profiling.phase("parse"):
+            parsed = parse(infile)
+        with profiling.phase("solve"):
+            return solve(parsed)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("filename")
+    log.add_arguments(parser)
+    profiling.add_arguments(parser)
     args = parser.parse_args()
-    main(args.filename)
+    log.setup(args.verbose)
+    with profiling.profile(args.profile, args.profile_top):
+        main(args.filename)
@@ -1,7 +1,14 @@
 import re
 import argparse
+import os
+import sys
 from dataclasses import dataclass, field
-from typing import List, NamedTuple, Set
+from typing import Dict, Iterable, List, NamedTuple, Set
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoclib import log, profiling, reader  # pylint: disable=wrong-import-position
+
+LOG = log.get_logger(__name__)
 
 
 class Position(NamedTuple):
@@ -51,8 +58,12 @@ class BeaconExclusionZone:
         self.beacon_map.add(beacon)
 
     def draw(self) -> str:
-        print(
-            f"Min/Max x {self.min_x}/{self.max_x} Min/Max y {self.min_y}/{self.max_y}"
+        LOG.debug(
+            "Min/Max x %d/%d Min/Max y %d/%d",
+            self.min_x,
+            self.max_x,
+            self.min_y,
+            self.max_y,
         )
         ts = []
         for y in range(self.min_y, self.max_y + 1):
@@ -70,7 +81,7 @@ class BeaconExclusionZone:
                     break
         return excluded
 
-    def exclude_beacons(self, target_row: int) -> None:
+    def exclude_beacons(self, target_row: int) -> int:
         count_excluded = 0
         last_threshold_distance_delta = -1
         for x in range(self.min_x, self.max_x + 1):
@@ -87,20 +98,22 @@ class BeaconExclusionZone:
                     test_x += 1
                     count_excluded += 1
 
-        print(f"Potential beacons: {count_excluded}")
+        LOG.info("Potential beacons: %d", count_excluded)
+        return count_excluded
 
 
 def calculate_distance(p1: Position, p2: Position) -> int:
     return abs(p1.x - p2.x) + abs(p1.y - p2.y)
 
 
-def build_beacon_map(lines: List[str]) -> BeaconExclusionZone:
+def build_beacon_map(lines: Iterable[str]) -> BeaconExclusionZone:
 
     beacon_zone = BeaconExclusionZone()
 
     regex = re.compile(
         r"Sensor at x=(\-?\d+), y=(\-?\d+): closest beacon is at x=(\-?\d+), y=(\-?\d+)"
     )
+    debug = LOG.isEnabledFor(log.DEBUG)
     for line in lines:
         match = regex.findall(line)
         assert match
@@ -109,23 +122,38 @@ def build_beacon_map(lines: List[str]) -> BeaconExclusionZone:
         beacon_zone.add_beacon(beacon)
         beacon_zone.sensors.append(sensor)
         beacon_zone.distances.append(calculate_distance(sensor, beacon))
-        print(f"Added beacon at {beacon}")
-        print(f"Added sensor at {sensor}")
+        if debug:
+            LOG.debug("Added beacon at %s", beacon)
+            LOG.debug("Added sensor at %s", sensor)
     return beacon_zone
 
 
-def main(filename: str, target_row: int) -> None:
+def parse(lines: Iterable[str]) -> BeaconExclusionZone:
+    beacon_zone = build_beacon_map(reader.lines(lines))
+    beacon_zone.init()
+    # print(beacon_zone.draw())
+    return beacon_zone
+
+
+def solve(beacon_zone: BeaconExclusionZone, target_row: int) -> Dict[str, int]:
+    return {"excluded": beacon_zone.exclude_beacons(target_row)}
+
+
+def main(filename: str, target_row: int) -> Dict[str, int]:
     with open(filename, "r", encoding="utf-8") as infile:
-        lines = [line.rstrip("\n") for line in infile.readlines()]
-        beacon_zone = build_beacon_map(lines)
-        beacon_zone.init()
-        # print(beacon_zone.draw())
-        beacon_zone.exclude_beacons(target_row)
+        with profiling.phase("parse"):
+            parsed = parse(infile)
+        with profiling.phase("solve"):
+            return solve(parsed, target_row)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("filename")
     parser.add_argument("--target-row", type=int, default=10)
+    log.add_arguments(parser)
+    profiling.add_arguments(parser)
     args = parser.parse_args()
-    main(args.filename, args.target_row)
+    log.setup(args.verbose)
+    with profiling.profile(args.profile, args.profile_top):
+        main(args.filename, args.target_row)
@@ -1,9 +1,18 @@
 import re
 import argparse
+import os
+import sys
 from dataclasses import dataclass, field
-from typing import List, NamedTuple
-from shapely import Polygon, geometry, MultiPolygon
-from shapely.ops import unary_union
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, NamedTuple, Set
+
+# shapely is slow to import and optional, so only the shapely engine loads it
+if TYPE_CHECKING:
+    from shapely import Polygon
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoclib import log, profiling, reader  # pylint: disable=wrong-import-position
+
+LOG = log.get_logger(__name__)
 
 
 class Position(NamedTuple):
@@ -21,7 +30,9 @@ class BeaconExclusionZone:
     sensors: List[Sensor] = field(default_factory=list)
 
 
-def get_sensor_exclusion(sensor: Sensor, beacon: Beacon) -> Polygon:
+def get_sensor_exclusion(sensor: Sensor, beacon: Beacon) -> "Polygon":
+    from shapely import Polygon  # pylint: disable=import-outside-toplevel
+
     dist = abs(sensor.x - beacon.x) + abs(sensor.y - beacon.y)
     return Polygon(
         [
@@ -33,8 +44,10 @@ def get_sensor_exclusion(sensor: Sensor, beacon: Beacon) -> Polygon:
     )
 
 
-def get_all_exclusions(sensors: List[Sensor], beacons: List[Beacon]) -> Polygon:
-    exclusion_list: List[Polygon] = []
+def get_all_exclusions(sensors: List[Sensor], beacons: List[Beacon]) -> "Polygon":
+    from shapely.ops import unary_union  # pylint: disable=import-outside-toplevel
+
+    exclusion_list: List["Polygon"] = []
     for sensor, beacon in zip(sensors, beacons):
         exclusion_list.append(get_sensor_exclusion(sensor, beacon))
     return unary_union(exclusion_list)
@@ -42,21 +55,112 @@ def get_all_exclusions(sensors: List[Sensor], beacons: List[Beacon]) -> Polygon:
 
 def build_potential_beacon_area(
     min_x: int, min_y: int, max_x: int, max_y: int
-) -> Polygon:
+) -> "Polygon":
+    from shapely import geometry  # pylint: disable=import-outside-toplevel
+
     return geometry.box(min_x, min_y, max_x, max_y)
 
 
-def filter_excluded(full_area: Polygon, exclusion_zone: Polygon) -> Polygon:
+def filter_excluded(full_area: "Polygon", exclusion_zone: "Polygon") -> "Polygon":
     return full_area.difference(exclusion_zone)
 
 
-def build_beacon_map(lines: List[str]) -> BeaconExclusionZone:
+def find_uncovered_shapely(
+    beacon_zone: "BeaconExclusionZone", min_coord: int, max_coord: int
+) -> Position:
+    """
+    Subtract the union of the sensor diamonds from the search area
+    Params:
+        beacon_zone: sensors and their closest beacons
+        min_coord: lowest x and y of the search area
+        max_coord: highest x and y of the search area
+    Returns: center of the area left uncovered
+    """
+    from shapely import MultiPolygon  # pylint: disable=import-outside-toplevel
+
+    exclusion_zone = get_all_exclusions(beacon_zone.sensors, beacon_zone.beacons)
+    full_area = build_potential_beacon_area(min_coord, min_coord, max_coord, max_coord)
+    remainder = filter_excluded(full_area, exclusion_zone)
+    if isinstance(remainder, MultiPolygon):
+        # example problem leaves us with a disjoint polygon
+        remainder = remainder.geoms[0]
+    x_center = round((remainder.bounds[0] + remainder.bounds[2]) / 2)
+    y_center = round((remainder.bounds[1] + remainder.bounds[3]) / 2)
+    LOG.debug("%s", remainder)
+    return Position(x_center, y_center)
+
+
+def find_uncovered_native(
+    beacon_zone: "BeaconExclusionZone", min_coord: int, max_coord: int
+) -> Position:
+    """
+    Find the uncovered point from the sensor diamonds alone. A single
+    uncovered point has every neighbour covered, so it lies just outside
+    at least one diamond on a diagonal x + y or x - y line, and on a line of
+    the other diagonal or the edge of the search area. Only the crossings
+    of those lines need to be checked.
+    Params:
+        beacon_zone: sensors and their closest beacons
+        min_coord: lowest x and y of the search area
+        max_coord: highest x and y of the search area
+    Returns: the uncovered point
+    Raises: ValueError if every point in the search area is covered
+    """
+    diamonds = [
+        (sensor, abs(sensor.x - beacon.x) + abs(sensor.y - beacon.y))
+        for sensor, beacon in zip(beacon_zone.sensors, beacon_zone.beacons)
+    ]
+    # y = x + rising and y = -x + falling just outside each diamond
+    rising: Set[int] = set()
+    falling: Set[int] = set()
+    for sensor, dist in diamonds:
+        for offset in (-dist - 1, dist + 1):
+            rising.add(sensor.y - sensor.x + offset)
+            falling.add(sensor.y + sensor.x + offset)
+
+    edges = (min_coord, max_coord)
+    candidates: Set[Position] = {Position(x, y) for x in edges for y in edges}
+    for up in rising:
+        for down in falling:
+            if (down - up) % 2 == 0:
+                candidates.add(Position((down - up) // 2, (down + up) // 2))
+    for edge in edges:
+        for up in rising:
+            candidates.add(Position(edge, edge + up))
+            candidates.add(Position(edge - up, edge))
+        for down in falling:
+            candidates.add(Position(edge, down - edge))
+            candidates.add(Position(down - edge, edge))
+    LOG.debug("Checking %d candidate points", len(candidates))
+
+    for candidate in sorted(candidates):
+        if not (
+            min_coord <= candidate.x <= max_coord
+            and min_coord <= candidate.y <= max_coord
+        ):
+            continue
+        if all(
+            abs(sensor.x - candidate.x) + abs(sensor.y - candidate.y) > dist
+            for sensor, dist in diamonds
+        ):
+            return candidate
+    raise ValueError("Every point in the search area is covered")
+
+
+ENGINES: Dict[str, Callable[["BeaconExclusionZone", int, int], Position]] = {
+    "native": find_uncovered_native,
+    "shapely": find_uncovered_shapely,
+}
+
+
+def build_beacon_map(lines: Iterable[str]) -> BeaconExclusionZone:
 
     beacon_zone = BeaconExclusionZone()
 
     regex = re.compile(
         r"Sensor at x=(\-?\d+), y=(\-?\d+): closest beacon is at x=(\-?\d+), y=(\-?\d+)"
     )
+    debug = LOG.isEnabledFor(log.DEBUG)
     for line in lines:
         match = regex.findall(line)
         assert match
@@ -64,28 +168,40 @@ def build_beacon_map(lines: List[str]) -> BeaconExclusionZone:
         beacon = Beacon(int(match[0][2]), int(match[0][3]))
         beacon_zone.beacons.append(beacon)
         beacon_zone.sensors.append(sensor)
-        print(f"Added beacon at {beacon}")
-        print(f"Added sensor at {sensor}")
+        if debug:
+            LOG.debug("Added beacon at %s", beacon)
+            LOG.debug("Added sensor at %s", sensor)
     return beacon_zone
 
 
-def main(filename: str, min_coord: int, max_coord: int) -> None:
+def parse(lines: Iterable[str]) -> BeaconExclusionZone:
+    return build_beacon_map(reader.lines(lines))
+
+
+def solve(
+    beacon_zone: BeaconExclusionZone,
+    min_coord: int,
+    max_coord: int,
+    engine: str = "native",
+) -> Dict[str, int]:
+    uncovered = ENGINES[engine](beacon_zone, min_coord, max_coord)
+    LOG.info("%d %d", uncovered.x, uncovered.y)
+    LOG.info("%d", uncovered.x * 4000000 + uncovered.y)
+    return {
+        "x": uncovered.x,
+        "y": uncovered.y,
+        "tuning_frequency": uncovered.x * 4000000 + uncovered.y,
+    }
+
+
+def main(
+    filename: str, min_coord: int, max_coord: int, engine: str = "native"
+) -> Dict[str, int]:
     with open(filename, "r", encoding="utf-8") as infile:
-        lines = [line.rstrip("\n") for line in infile.readlines()]
-        beacon_zone = build_beacon_map(lines)
-        exclusion_zone = get_all_exclusions(beacon_zone.sensors, beacon_zone.beacons)
-        full_area = build_potential_beacon_area(
-            min_coord, min_coord, max_coord, max_coord
-        )
-        remainder = filter_excluded(full_area, exclusion_zone)
-        if isinstance(remainder, MultiPolygon):
-            # example problem leaves us with a disjoint polygon
-            remainder = remainder.geoms[0]
-        x_center = round((remainder.bounds[0] + remainder.bounds[2]) / 2)
-        y_center = round((remainder.bounds[1] + remainder.bounds[3]) / 2)
-        print(remainder)
-        print(x_center, y_center)
-        print(x_center * 4000000 + y_center)
+        with profiling.phase("parse"):
+            parsed = parse(infile)
+        with profiling.phase("solve"):
+            return solve(parsed, min_coord, max_coord, engine)
 
 
 if __name__ == "__main__":
@@ -93,5 +209,10 @@ if __name__ == "__main__":
     parser.add_argument("filename")
     parser.add_argument("--min-coord", default=0, type=int)
     parser.add_argument("--max-coord", default=4000000, type=int)
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="native")
+    log.add_arguments(parser)
+    profiling.add_arguments(parser)
     args = parser.parse_args()
-    main(args.filename, args.min_coord, args.max_coord)
+    log.setup(args.verbose)
+    with profiling.profile(args.profile, args.profile_top):
+        main(args.filename, args.min_coord, args.max_coord, args.engine)
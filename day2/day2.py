@@ -3,6 +3,15 @@ AOC 2022 Day 2 Solution
 """
 
 import argparse
+from collections import Counter
+from typing import Dict, Iterable, Iterator, Tuple
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoclib import log, profiling  # pylint: disable=wrong-import-position
+
+LOG = log.get_logger(__name__)
 
 ROCK = 1
 PAPER = 2
@@ -34,49 +43,150 @@ def winner(oppo_move: int, my_move: int) -> int:
     return WINNER.get((oppo_move, my_move), DRAW)
 
 
-def part1_main(fname: str) -> None:
+def score_part1(oppo_str: str, my_str: str) -> int:
+    """
+    Score one round treating the second column as my move
+    """
+    oppo_move, my_move = MOVES[oppo_str], MOVES[my_str]
+    return winner(oppo_move, my_move) + my_move
+
+
+def score_part2(oppo_move_str: str, my_result_str: str) -> int:
+    """
+    Score one round treating the second column as the desired result
+    """
+    oppo_move = MOVES[oppo_move_str]
+    if RESULT[my_result_str] == DRAW:
+        return oppo_move + DRAW
+    if RESULT[my_result_str] == WIN:
+        return DISADVANTAGE[oppo_move] + WIN
+    return ADVANTAGE[oppo_move] + LOSE
+
+
+# there are only nine kinds of round, so both parts score from 3x3 tables
+ROUNDS = [(oppo_str, my_str) for oppo_str in "ABC" for my_str in "XYZ"]
+PART1_SCORES = {kind: score_part1(*kind) for kind in ROUNDS}
+PART2_SCORES = {kind: score_part2(*kind) for kind in ROUNDS}
+
+
+def parse(lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """
+    Split each strategy guide line into its two columns
+    """
+    for line in lines:
+        oppo_str, my_str = line.split()
+        yield oppo_str, my_str
+
+
+def solve_part1(rounds: Iterable[Tuple[str, str]]) -> Dict[str, int]:
+    """
+    Score the guide treating the second column as my move
+    """
+    total_points = 0
+    for oppo_str, my_str in rounds:
+        total_points += score_part1(oppo_str, my_str)
+
+    LOG.info("Total: %d", total_points)
+    return {"total": total_points}
+
+
+def solve_part2(rounds: Iterable[Tuple[str, str]]) -> Dict[str, int]:
+    """
+    Score the guide treating the second column as the desired result
+    """
+    total_points = 0
+    for oppo_move_str, my_result_str in rounds:
+        total_points += score_part2(oppo_move_str, my_result_str)
+
+    LOG.info("Total: %d", total_points)
+    return {"total": total_points}
+
+
+def count_rounds(data: bytes) -> Dict[Tuple[str, str], int]:
+    """
+    Count each kind of round straight from the raw input. Each count is a
+    single scan in C, so the time is spent scanning bytes rather than
+    handling lines in the interpreter.
+    Params:
+        data: the whole strategy guide
+    Returns: number of rounds of each kind
+    """
+    return {
+        (oppo_str, my_str): data.count(f"{oppo_str} {my_str}".encode())
+        for oppo_str, my_str in ROUNDS
+    }
+
+
+def score_counts(counts: Dict[Tuple[str, str], int]) -> Dict[str, int]:
+    """
+    Score both parts from the number of rounds of each kind
+    Params:
+        counts: number of rounds of each kind
+    Returns: the part 1 and part 2 totals
+    """
+    part1 = sum(PART1_SCORES[kind] * count for kind, count in counts.items())
+    part2 = sum(PART2_SCORES[kind] * count for kind, count in counts.items())
+    LOG.info("Part 1 total: %d", part1)
+    LOG.info("Part 2 total: %d", part2)
+    return {"part1": part1, "part2": part2}
+
+
+def solve(rounds: Iterable[Tuple[str, str]]) -> Dict[str, int]:
+    """
+    Score both parts in one pass by counting the kinds of round
+    """
+    return score_counts(Counter(rounds))
+
+
+def part1_main(fname: str) -> Dict[str, int]:
     """
     Part1 solution
     """
     with open(fname, "r", encoding="utf-8") as infile:
-        lines = infile.readlines()
-        total_points = 0
-        for line in lines:
-            moves = [MOVES[move.rstrip()] for move in line.split(" ")]
-            oppo_move, my_move = moves[0], moves[1]
-            points = winner(oppo_move, my_move) + my_move
-            total_points += points
-
-        print(f"Total: {total_points}")
+        with profiling.phase("parse"):
+            parsed = parse(infile)
+        with profiling.phase("solve"):
+            return solve_part1(parsed)
 
 
-def part2_main(fname: str) -> None:
+def part2_main(fname: str) -> Dict[str, int]:
     """
     Part2 solution
     """
     with open(fname, "r", encoding="utf-8") as infile:
-        lines = infile.readlines()
-        total_points = 0
-        for line in lines:
-            oppo_move_str, my_result_str = line.rstrip("\n").split(" ")
-            oppo_move = MOVES[oppo_move_str]
-            if RESULT[my_result_str] == DRAW:
-                total_points += oppo_move + DRAW
-            elif RESULT[my_result_str] == WIN:
-                total_points += DISADVANTAGE[oppo_move] + WIN
-            else:
-                total_points += ADVANTAGE[oppo_move] + LOSE
+        with profiling.phase("parse"):
+            parsed = parse(infile)
+        with profiling.phase("solve"):
+            return solve_part2(parsed)
+
 
-        print(f"Total: {total_points}")
+def count_main(fname: str) -> Dict[str, int]:
+    """
+    Both parts from one scan of the raw input
+    """
+    with open(fname, "rb") as infile:
+        with profiling.phase("parse"):
+            counts = count_rounds(infile.read())
+        with profiling.phase("solve"):
+            return score_counts(counts)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--part1", action="store_true")
+    parser.add_argument(
+        "--count", action="store_true", help="score both parts by counting rounds"
+    )
     parser.add_argument("filename")
+    log.add_arguments(parser)
+    profiling.add_arguments(parser)
 
     args = parser.parse_args()
-    if args.part1:
-        part1_main(args.filename)
-    else:
-        part2_main(args.filename)
+    log.setup(args.verbose)
+    with profiling.profile(args.profile, args.profile_top):
+        if args.count:
+            count_main(args.filename)
+        elif args.part1:
+            part1_main(args.filename)
+        else:
+            part2_main(args.filename)
@@ -2,57 +2,207 @@
 Day3 Python solution
 """
 import argparse
+import string
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, Tuple
+import os
+import sys
 
+# numpy is optional, so only the bitmask engine loads it
+if TYPE_CHECKING:
+    import numpy as np
 
-def p1_main(fname: str) -> None:
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoclib import log, profiling, reader  # pylint: disable=wrong-import-position
+
+LOG = log.get_logger(__name__)
+
+
+def parse(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Strip the newline from each rucksack
+    """
+    return reader.lines(lines)
+
+
+def solve_part1(rucksacks: Iterable[str]) -> Dict[str, int]:
+    """
+    Sum the priorities of the item common to both compartments of each rucksack
+    """
+    total = 0
+    for line in rucksacks:
+        first_compartment, second_compartment = (
+            line[: len(line) // 2],
+            line[len(line) // 2 :],
+        )
+        common_chars = set(first_compartment).intersection(second_compartment)
+        for mychar in common_chars:
+            if "a" <= mychar <= "z":
+                total += ord(mychar) - ord("a") + 1
+            else:
+                total += ord(mychar) - ord("A") + 27
+    LOG.info("Total: %d", total)
+    return {"total": total}
+
+
+def solve_part2(rucksacks: Iterable[str], group_size: int = 3) -> Dict[str, int]:
+    """
+    Sum the priorities of the badge common to each group of elves
+    """
+    total = 0
+
+    for group in reader.groups(rucksacks, group_size):
+        common_chars = set(group[0]).intersection(*group[1:])
+        for mychar in common_chars:
+            if "a" <= mychar <= "z":
+                total += ord(mychar) - ord("a") + 1
+            else:
+                total += ord(mychar) - ord("A") + 27
+    LOG.info("Total: %d", total)
+    return {"total": total}
+
+
+def priority_bits() -> "np.ndarray":
+    """
+    Table from each byte to its item's bit: bit 0 for a, up to bit 51 for Z.
+    Other bytes, such as line endings, map to no bits.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    table = np.zeros(256, dtype=np.uint64)
+    for bit, item in enumerate(string.ascii_lowercase + string.ascii_uppercase):
+        table[ord(item)] = 1 << bit
+    return table
+
+
+def mask_priorities(masks: "np.ndarray") -> int:
+    """
+    Sum the priorities of every item set in every mask, the priority being
+    the bit position plus one
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    return sum(
+        (bit + 1) * int(np.count_nonzero(masks & np.uint64(1 << bit)))
+        for bit in range(52)
+    )
+
+
+def parse_bitmask(data: bytes) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Encode each compartment of each rucksack as an item bitmask. Every byte
+    of the input is mapped to its item's bit through priority_bits and the
+    bits of each compartment are ORed into one mask, as array operations
+    across every rucksack at once.
+    Params:
+        data: the whole input
+    Returns: masks of the first and of the second compartments
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    raw = np.frombuffer(data, dtype=np.uint8)
+    bits = priority_bits()[raw]
+    newlines = np.flatnonzero(raw == ord("\n"))
+    ends = newlines
+    if raw.size and raw[-1] != ord("\n"):
+        ends = np.append(newlines, raw.size)
+    starts = np.concatenate(([0], newlines + 1))[: ends.size]
+    ends = ends - ((ends > starts) & (raw[np.maximum(ends - 1, 0)] == ord("\r")))
+    rucksacks = ends > starts
+    starts, ends = starts[rucksacks], ends[rucksacks]
+
+    # OR over each first compartment and over each second compartment up
+    # to the next rucksack; line endings between them add no bits
+    middles = (starts + ends) // 2
+    bounds = np.empty(2 * starts.size, dtype=np.int64)
+    bounds[0::2] = starts
+    bounds[1::2] = middles
+    compartments = np.bitwise_or.reduceat(bits, bounds) if bounds.size else bits[:0]
+    first, second = compartments[0::2], compartments[1::2]
+    # reduceat gives the item at the bound for an empty segment, and a one
+    # item rucksack has an empty first compartment
+    first[starts == middles] = 0
+    return first, second
+
+
+def solve_bitmask(
+    compartments: Tuple["np.ndarray", "np.ndarray"], group_size: int = 3
+) -> Dict[str, int]:
+    """
+    Score both parts from the compartment masks of parse_bitmask, finding
+    common items by ANDing masks
+    Params:
+        compartments: masks of the first and of the second compartments
+        group_size: number of elves sharing a badge
+    Returns: the part 1 and part 2 totals
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    first, second = compartments
+    if len(first) % group_size:
+        raise ValueError(
+            f"{len(first)} rucksacks do not split into groups of {group_size}"
+        )
+
+    part1 = mask_priorities(first & second)
+    badges = np.bitwise_and.reduce((first | second).reshape(-1, group_size), axis=1)
+    part2 = mask_priorities(badges)
+    LOG.info("Part 1 total: %d", part1)
+    LOG.info("Part 2 total: %d", part2)
+    return {"part1": part1, "part2": part2}
+
+
+def p1_main(fname: str) -> Dict[str, int]:
     """
     Part 1 solution main
     """
     with open(fname, "r", encoding="utf-8") as infile:
-        lines = [line.rstrip("\n") for line in infile.readlines()]
-        total = 0
-        for line in lines:
-            first_compartment, second_compartment = (
-                line[: len(line) // 2],
-                line[len(line) // 2 :],
-            )
-            common_chars = set(first_compartment).intersection(second_compartment)
-            for mychar in common_chars:
-                if "a" <= mychar <= "z":
-                    total += ord(mychar) - ord("a") + 1
-                else:
-                    total += ord(mychar) - ord("A") + 27
-        print(f"Total: {total}")
-
-
-def p2_main(fname: str) -> None:
+        with profiling.phase("parse"):
+            parsed = parse(infile)
+        with profiling.phase("solve"):
+            return solve_part1(parsed)
+
+
+def p2_main(fname: str, group_size: int = 3) -> Dict[str, int]:
     """
     Part 2 solution main
     """
     with open(fname, "r", encoding="utf-8") as infile:
-        lines = [line.rstrip("\n") for line in infile.readlines()]
-        total = 0
-
-        for i in range(0, len(lines), 3):
-            first_elf = set(lines[i])
-            second_elf = set(lines[i + 1])
-            third_elf = set(lines[i + 2])
-            common_chars = first_elf.intersection(second_elf).intersection(third_elf)
-            for mychar in common_chars:
-                if "a" <= mychar <= "z":
-                    total += ord(mychar) - ord("a") + 1
-                else:
-                    total += ord(mychar) - ord("A") + 27
-        print(f"Total: {total}")
+        with profiling.phase("parse"):
+            parsed = parse(infile)
+        with profiling.phase("solve"):
+            return solve_part2(parsed, group_size)
+
+
+def bitmask_main(fname: str, group_size: int = 3) -> Dict[str, int]:
+    """
+    Both parts with the bitmask engine
+    """
+    with open(fname, "rb") as infile:
+        with profiling.phase("parse"):
+            parsed = parse_bitmask(infile.read())
+        with profiling.phase("solve"):
+            return solve_bitmask(parsed, group_size)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("filename")
     parser.add_argument("--part1", action="store_true")
+    parser.add_argument("--group-size", default=3, type=int)
+    parser.add_argument(
+        "--bitmask",
+        action="store_true",
+        help="score both parts with item bitmasks (needs numpy)",
+    )
+    log.add_arguments(parser)
+    profiling.add_arguments(parser)
 
     args = parser.parse_args()
-    if args.part1:
-        p1_main(args.filename)
-    else:
-        p2_main(args.filename)
+    log.setup(args.verbose)
+    with profiling.profile(args.profile, args.profile_top):
+        if args.bitmask:
+            bitmask_main(args.filename, args.group_size)
+        elif args.part1:
+            p1_main(args.filename)
+        else:
+            p2_main(args.filename, args.group_size)
@@ -1,8 +1,29 @@
 """
 Advent of Code 2022 Day 4
 """
-from typing import List, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Tuple,
+)
 import argparse
+import bisect
+import os
+import sys
+
+# numpy is optional, so only the bulk mode loads it
+if TYPE_CHECKING:
+    import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoclib import log, profiling  # pylint: disable=wrong-import-position
+
+LOG = log.get_logger(__name__)
 
 
 def contains(r1: Tuple[int, int], r2: Tuple[int, int]) -> bool:
@@ -23,29 +44,377 @@ def overlap(r1: Tuple[int, int], r2: Tuple[int, int]) -> bool:
     return False
 
 
-def main(fname: str) -> None:
+Range = Tuple[int, int]
+
+
+def parse(lines: Iterable[str]) -> Iterator[Tuple[Range, Range]]:
+    """
+    Convert each a-b,c-d line into a pair of section ranges
+    """
+    for line in lines:
+        elf_assignments: List[str] = line.rstrip("\n").split(",")
+        ranges = []
+        for assign in elf_assignments:
+            range_str = assign.split("-")
+            ranges.append((int(range_str[0]), int(range_str[1])))
+        yield ranges[0], ranges[1]
+
+
+def solve(pairs: Iterable[Tuple[Range, Range]]) -> Dict[str, int]:
+    """
+    Count the pairs where one range contains the other and the pairs
+    that overlap at all
+    """
+    contains_count = 0
+    overlap_count = 0
+    for first, second in pairs:
+        if contains(first, second) or contains(second, first):
+            contains_count += 1
+        if overlap(first, second):
+            overlap_count += 1
+    LOG.info("Contains count: %d", contains_count)
+    LOG.info("Overlap count: %d", overlap_count)
+    return {"contains": contains_count, "overlap": overlap_count}
+
+
+class Assignment(NamedTuple):
+    """
+    One elf's section range within the roster
+    pair: position of the pair in the input, starting at 1
+    elf: 1 or 2 for the first or second elf of the pair
+    """
+
+    pair: int
+    elf: int
+    start: int
+    end: int
+
+
+class IntervalNode:
+    """
+    Node of a centered interval tree, holding the assignments that cover its
+    center section. Assignments entirely below or above the center are held
+    by the left or right subtree.
+    """
+
+    def __init__(self, assignments: List[Assignment]) -> None:
+        """
+        Params:
+            assignments: non-empty list of assignments to index
+        """
+        endpoints = sorted(
+            section
+            for assignment in assignments
+            for section in (assignment.start, assignment.end)
+        )
+        # the median endpoint belongs to some assignment, so no node is empty
+        self.center = endpoints[len(endpoints) // 2]
+        below = [item for item in assignments if item.end < self.center]
+        above = [item for item in assignments if item.start > self.center]
+        here = [
+            item for item in assignments if item.start <= self.center <= item.end
+        ]
+        self.by_start = sorted(here, key=lambda item: item.start)
+        self.starts = [item.start for item in self.by_start]
+        self.by_end = sorted(here, key=lambda item: item.end)
+        self.ends = [item.end for item in self.by_end]
+        self.left = IntervalNode(below) if below else None
+        self.right = IntervalNode(above) if above else None
+
+
+class IntervalIndex:
+    """
+    Index of every assignment in the roster. Which assignments overlap a
+    range is answered from a centered interval tree, and how many elves
+    cover a section from sorted start and end sections, both without
+    scanning the whole roster.
+    """
+
+    def __init__(self, assignments: Iterable[Assignment]) -> None:
+        self.assignments = list(assignments)
+        self.root = IntervalNode(self.assignments) if self.assignments else None
+        self.starts = sorted(item.start for item in self.assignments)
+        self.ends = sorted(item.end for item in self.assignments)
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[Range, Range]]) -> "IntervalIndex":
+        """
+        Index both ranges of every parsed pair
+        """
+        return cls(
+            Assignment(pair, elf, *section_range)
+            for pair, ranges in enumerate(pairs, 1)
+            for elf, section_range in enumerate(ranges, 1)
+        )
+
+    def overlapping(self, start: int, end: int) -> List[Assignment]:
+        """
+        Find the assignments sharing at least one section with a range in
+        O(log n + k) for k matches
+        Params:
+            start: first section of the range
+            end: last section of the range
+        Returns: the matching assignments in input order
+        """
+        found: List[Assignment] = []
+        pending = [self.root]
+        while pending:
+            node = pending.pop()
+            if node is None:
+                continue
+            if end < node.center:
+                # everything here reaches the center, so past end as well
+                found.extend(node.by_start[: bisect.bisect_right(node.starts, end)])
+                pending.append(node.left)
+            elif start > node.center:
+                found.extend(node.by_end[bisect.bisect_left(node.ends, start) :])
+                pending.append(node.right)
+            else:
+                found.extend(node.by_start)
+                pending.append(node.left)
+                pending.append(node.right)
+        return sorted(found)
+
+    def stab(self, section: int) -> List[Assignment]:
+        """
+        Find the assignments covering one section
+        """
+        return self.overlapping(section, section)
+
+    def depth(self, section: int) -> int:
+        """
+        Count the elves covering one section in O(log n)
+        """
+        return bisect.bisect_right(self.starts, section) - bisect.bisect_left(
+            self.ends, section
+        )
+
+    def coverage(self) -> List[Tuple[int, int, int]]:
+        """
+        Sweep the sections from the lowest start to the highest end
+        Returns: (first section, last section, depth) for each run of
+        sections covered by the same number of elves, in section order
+        """
+        changes: Dict[int, int] = {}
+        for item in self.assignments:
+            changes[item.start] = changes.get(item.start, 0) + 1
+            changes[item.end + 1] = changes.get(item.end + 1, 0) - 1
+        runs: List[Tuple[int, int, int]] = []
+        depth = 0
+        sections = sorted(changes)
+        for section, next_section in zip(sections, sections[1:]):
+            depth += changes[section]
+            if runs and runs[-1][2] == depth:
+                runs[-1] = (runs[-1][0], next_section - 1, depth)
+            else:
+                runs.append((section, next_section - 1, depth))
+        return runs
+
+
+def section_range(text: str) -> Range:
+    """
+    Read a range given as a-b, or a single section a, on the command line
+    """
+    first, _sep, last = text.partition("-")
+    return int(first), int(last or first)
+
+
+def query(
+    index: IntervalIndex,
+    ranges: Iterable[Range],
+    sections: Iterable[int],
+    show_coverage: bool,
+) -> Dict[str, Any]:
+    """
+    Answer roster queries from the index
+    Params:
+        index: index of the whole roster
+        ranges: ranges to find the overlapping assignments of
+        sections: sections to count the covering elves of
+        show_coverage: also report the depth of every run of sections
+    Returns: the matches of each range, the depth of each section and the
+    coverage runs if asked for
+    """
+    results: Dict[str, Any] = {"overlapping": {}, "depth": {}}
+    for start, end in ranges:
+        matches = index.overlapping(start, end)
+        LOG.info("Sections %d-%d overlap %d assignments", start, end, len(matches))
+        for match in matches:
+            LOG.debug(
+                "Pair %d elf %d: %d-%d", match.pair, match.elf, match.start, match.end
+            )
+        results["overlapping"][f"{start}-{end}"] = [
+            [match.pair, match.elf] for match in matches
+        ]
+    for section in sections:
+        depth = index.depth(section)
+        LOG.info("Section %d is covered by %d elves", section, depth)
+        results["depth"][section] = depth
+    if show_coverage:
+        results["coverage"] = index.coverage()
+        for first, last, depth in results["coverage"]:
+            LOG.info("Sections %d-%d: %d elves", first, last, depth)
+    return results
+
+
+# every separator in an a-b,c-d line, mapped to a space for bulk parsing
+SEPARATORS = bytes.maketrans(b"-,\r\n", b"    ")
+
+# how the two ranges of a pair relate, for the bulk histogram
+RELATIONSHIPS = ("equal", "contains", "partial", "adjacent", "disjoint")
+
+
+def parse_array(data: bytes) -> "np.ndarray":
+    """
+    Parse the whole input at once
+    Params:
+        data: the whole input
+    Returns: (N, 4) array holding the first start and end and the second
+    start and end of each pair
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    text = data.translate(SEPARATORS).decode("ascii")
+    return np.fromstring(text, dtype=np.int64, sep=" ").reshape(-1, 4)
+
+
+def solve_array(pairs: "np.ndarray") -> Dict[str, Any]:
+    """
+    Analyse every pair with vectorized comparisons
+    Params:
+        pairs: (N, 4) array from parse_array
+    Returns: containment and overlap counts as from solve, the sections
+    covered by both ranges and by either range summed over all pairs, and
+    the number of pairs in each relationship
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    first_start, first_end, second_start, second_end = pairs.T
+    first_contains = (first_start <= second_start) & (first_end >= second_end)
+    second_contains = (second_start <= first_start) & (second_end >= first_end)
+    shared = np.minimum(first_end, second_end) - np.maximum(first_start, second_start)
+    overlaps = shared >= 0
+    overlap_lengths = np.maximum(shared + 1, 0)
+    union_lengths = (
+        (first_end - first_start + 1)
+        + (second_end - second_start + 1)
+        - overlap_lengths
+    )
+
+    contains_count = int(np.count_nonzero(first_contains | second_contains))
+    overlap_count = int(np.count_nonzero(overlaps))
+    equal = int(np.count_nonzero(first_contains & second_contains))
+    adjacent = int(np.count_nonzero(shared == -1))
+    histogram = dict(
+        zip(
+            RELATIONSHIPS,
+            [
+                equal,
+                contains_count - equal,
+                overlap_count - contains_count,
+                adjacent,
+                len(pairs) - overlap_count - adjacent,
+            ],
+        )
+    )
+
+    LOG.info("Contains count: %d", contains_count)
+    LOG.info("Overlap count: %d", overlap_count)
+    LOG.info("Overlapping sections: %d", int(overlap_lengths.sum()))
+    LOG.info("Covered sections: %d", int(union_lengths.sum()))
+    for relationship, count in histogram.items():
+        LOG.info("%s: %d", relationship, count)
+    return {
+        "contains": contains_count,
+        "overlap": overlap_count,
+        "overlap_sections": int(overlap_lengths.sum()),
+        "union_sections": int(union_lengths.sum()),
+        "relationships": histogram,
+    }
+
+
+def main(fname: str) -> Dict[str, int]:
     """
     Main processing function
     """
     with open(fname, "r", encoding="utf-8") as infile:
-        contains_count = 0
-        overlap_count = 0
-        for line in infile.readlines():
-            elf_assignments: List[str] = line.rstrip("\n").split(",")
-            ranges = []
-            for assign in elf_assignments:
-                range_str = assign.split("-")
-                ranges.append((int(range_str[0]), int(range_str[1])))
-            if contains(ranges[0], ranges[1]) or contains(ranges[1], ranges[0]):
-                contains_count += 1
-            if overlap(ranges[0], ranges[1]):
-                overlap_count += 1
-        print(f"Contains count: {contains_count}")
-        print(f"Overlap count: {overlap_count}")
+        with profiling.phase("parse"):
+            parsed = parse(infile)
+        with profiling.phase("solve"):
+            return solve(parsed)
+
+
+def index_main(
+    fname: str,
+    ranges: Iterable[Range] = (),
+    sections: Iterable[int] = (),
+    show_coverage: bool = False,
+) -> Dict[str, Any]:
+    """
+    Index the whole roster and answer queries across every pair
+    Params:
+        fname: input filename
+        ranges: ranges to find the overlapping assignments of
+        sections: sections to count the covering elves of
+        show_coverage: also report the depth of every run of sections
+    """
+    with open(fname, "r", encoding="utf-8") as infile:
+        with profiling.phase("parse"):
+            index = IntervalIndex.from_pairs(parse(infile))
+    with profiling.phase("solve"):
+        return query(index, ranges, sections, show_coverage)
+
+
+def bulk_main(fname: str) -> Dict[str, Any]:
+    """
+    Parse and analyse the whole file with array operations
+    """
+    with open(fname, "rb") as infile:
+        data = infile.read()
+    with profiling.phase("parse"):
+        pairs = parse_array(data)
+    with profiling.phase("solve"):
+        return solve_array(pairs)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("filename")
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="analyse every pair with array operations (needs numpy)",
+    )
+    parser.add_argument(
+        "--overlapping",
+        action="append",
+        default=[],
+        type=section_range,
+        metavar="A-B",
+        help="list the assignments across all pairs overlapping sections A-B, "
+        "or covering section A alone (repeatable)",
+    )
+    parser.add_argument(
+        "--depth",
+        action="append",
+        default=[],
+        type=int,
+        metavar="SECTION",
+        help="count the elves covering SECTION (repeatable)",
+    )
+    parser.add_argument(
+        "--coverage",
+        action="store_true",
+        help="count the elves covering every section, as runs of sections",
+    )
+    log.add_arguments(parser)
+    profiling.add_arguments(parser)
     args = parser.parse_args()
-    main(args.filename)
+    log.setup(args.verbose)
+    with profiling.profile(args.profile, args.profile_top):
+        if args.overlapping or args.depth or args.coverage:
+            index_main(args.filename, args.overlapping, args.depth, args.coverage)
+        elif args.bulk:
+            bulk_main(args.filename)
+        else:
+            main(args.filename)
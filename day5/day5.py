@@ -2,8 +2,19 @@
 Advent of Code Day5
 """
 import argparse as ap
+import hashlib
+import itertools
+import json
+import os
 import re
-from typing import List, Tuple
+import sys
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoclib import log, profiling  # pylint: disable=wrong-import-position
+
+LOG = log.get_logger(__name__)
 
 
 def parse_drawing_line(line: str) -> List[Tuple[str, int]]:
@@ -28,18 +39,37 @@ def parse_drawing_line(line: str) -> List[Tuple[str, int]]:
             crates.append((line[i + 1], stack_num))
             i += 4
             stack_num += 1
-    print(f"Line {line} has crates {crates}")
+    LOG.debug("Line %s has crates %s", line, crates)
     return crates
 
 
+def split_point(stack: List[str], stack_num: int, num_crates: int) -> int:
+    """
+    Index in a stack of the lowest crate lifted by a move
+    stack: stack the crates are lifted from
+    stack_num: number of the stack, for the error message
+    num_crates: number of crates lifted
+    Raises: ValueError if the stack holds fewer crates
+    """
+    if num_crates > len(stack):
+        raise ValueError(
+            f"Cannot move {num_crates} crates from stack {stack_num} "
+            f"holding {len(stack)}"
+        )
+    return len(stack) - num_crates
+
+
 def move_crates_9001(
     crates: List[List[str]], src: int, dest: int, num_crates: int
 ) -> None:
     """
-    Move num_crates from top of src stack to dest stack
+    Move num_crates from top of src stack to dest stack, keeping their order.
+    Only the moved crates are copied; the source stack is truncated in place.
     """
-    crates_to_move = crates[src - 1][-num_crates:]
-    crates[src - 1] = crates[src - 1][:-num_crates]
+    source = crates[src - 1]
+    split = split_point(source, src, num_crates)
+    crates_to_move = source[split:]
+    del source[split:]
     crates[dest - 1].extend(crates_to_move)
 
 
@@ -47,57 +77,349 @@ def move_crates_9000(
     crates: List[List[str]], src: int, dest: int, num_crates: int
 ) -> None:
     """
-    Move num_crates from top of src stack to dest stack - one at a time
+    Move num_crates from top of src stack to dest stack - one at a time, so
+    they land in reverse order. The whole move is one slice rather than a
+    pop and append per crate.
+    """
+    source = crates[src - 1]
+    split = split_point(source, src, num_crates)
+    if src == dest:
+        # each crate is lifted and put straight back
+        return
+    crates_to_move = source[split:]
+    crates_to_move.reverse()
+    del source[split:]
+    crates[dest - 1].extend(crates_to_move)
+
+
+Stacks = List[List[str]]
+CrateMove = Tuple[int, int, int]
+
+
+def parse_moves(lines: Iterable[str]) -> Iterator[CrateMove]:
+    """
+    Read the move list lazily.
+    lines: input lines following the drawing
+    Returns: iterator over (number of crates, source stack, destination stack)
+    """
+    move_re = re.compile(r"move (\d+) from (\d+) to (\d+)")
+    for line in lines:
+        match = move_re.findall(line.rstrip())
+        if match:
+            yield int(match[0][0]), int(match[0][1]), int(match[0][2])
+
+
+def parse(lines: Iterable[str]) -> Tuple[Stacks, Iterator[CrateMove]]:
+    """
+    Parse the crate drawing; the move list that follows it is read as the
+    moves are applied.
+    lines: input lines
+    Returns: the stacks, bottom crate first, and an iterator over
+    (number of crates, source stack, destination stack) moves
+    """
+    line_iter = iter(lines)
+    stacks: Stacks = []
+    for line in line_iter:
+        new_crates = parse_drawing_line(line)
+        if not new_crates:
+            break
+        for crate in new_crates:
+            label, stack_num = crate
+            for i in range(len(stacks), stack_num, 1):
+                stacks.append([])
+            stacks[stack_num - 1].append(label)
+    for i, stack in enumerate(stacks):
+        stacks[i] = stack[::-1]
+
+    # skip the blank line between the drawing and the moves
+    next(line_iter, None)
+    return stacks, parse_moves(line_iter)
+
+
+def apply_moves(
+    stacks: Stacks, moves: Iterable[CrateMove], is_crate_mover_9001: bool
+) -> int:
+    """
+    Apply moves to the stacks in place.
+    stacks: stacks to rearrange
+    moves: (number of crates, source stack, destination stack) moves
+    is_crate_mover_9001: bool - use CrateMover9001 behavior
+    Returns: number of moves applied
+    """
+    debug = LOG.isEnabledFor(log.DEBUG)
+    applied = 0
+    for num_crates_to_move, from_stack, to_stack in moves:
+        if debug:
+            LOG.debug("Move %d from %d to %d", num_crates_to_move, from_stack, to_stack)
+        if is_crate_mover_9001:
+            move_crates_9001(stacks, from_stack, to_stack, num_crates_to_move)
+        else:
+            move_crates_9000(stacks, from_stack, to_stack, num_crates_to_move)
+        applied += 1
+    return applied
+
+
+def top_crates(stacks: Stacks) -> str:
+    """
+    Log and return the crates on top of the stacks. An empty stack, e.g.
+    partway through the moves, has no crate to contribute.
+    """
+    if LOG.isEnabledFor(log.DEBUG):
+        for index, stack in enumerate(stacks):
+            if stack:
+                LOG.debug("Top of stack %d is %s", index + 1, stack[-1])
+            else:
+                LOG.debug("Stack %d is empty", index + 1)
+    result_str = "".join([stack[-1] for stack in stacks if stack])
+    LOG.info("Result: %s", result_str)
+    return result_str
+
+
+def solve(
+    drawing: Tuple[Stacks, Iterable[CrateMove]], is_crate_mover_9001: bool
+) -> Dict[str, str]:
+    """
+    Apply every move to the stacks and report the crates left on top.
+    drawing: stacks and moves returned by parse
+    is_crate_mover_9001: bool - use CrateMover9001 behavior
+    """
+    stacks, moves = drawing
+    apply_moves(stacks, moves, is_crate_mover_9001)
+    return {"result": top_crates(stacks)}
+
+
+class SnapshotStore:
+    """
+    Directory of snapshots of one drawing's stacks for one crane model. Each
+    snapshot is a JSON file named after the number of moves it has applied
+    and a running hash of those moves, and the drawing is identified by a
+    hash of its initial stacks. A snapshot is only resumed from by a log
+    whose moves up to that point hash the same, so logs sharing a drawing
+    can share a directory.
+    """
+
+    def __init__(
+        self, directory: str, stacks: Stacks, is_crate_mover_9001: bool
+    ) -> None:
+        """
+        directory: where snapshots are stored, created if missing
+        stacks: initial stacks of the drawing, before any move
+        is_crate_mover_9001: bool - snapshots of CrateMover9001 behavior
+        """
+        self.directory = directory
+        digest = hashlib.sha256(json.dumps(stacks).encode()).hexdigest()
+        model = "9001" if is_crate_mover_9001 else "9000"
+        self.prefix = f"day5-{model}-{digest[:16]}-"
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, moves: int, moves_digest: str) -> str:
+        return os.path.join(
+            self.directory, f"{self.prefix}{moves:012d}-{moves_digest}.json"
+        )
+
+    def entries(self) -> Dict[int, Set[str]]:
+        """
+        Returns: the hashes of the moves of every stored snapshot, by the
+        number of moves applied
+        """
+        found: Dict[int, Set[str]] = {}
+        for filename in os.listdir(self.directory):
+            if filename.startswith(self.prefix) and filename.endswith(".json"):
+                stem = filename[len(self.prefix) : -len(".json")]
+                moves, _sep, moves_digest = stem.partition("-")
+                found.setdefault(int(moves), set()).add(moves_digest)
+        return found
+
+    def save(self, moves: int, moves_digest: str, stacks: Stacks) -> None:
+        """
+        Store the stacks as they are after a number of moves
+        moves: number of moves applied
+        moves_digest: running hash of those moves
+        stacks: stacks after them
+        """
+        path = self._path(moves, moves_digest)
+        payload = json.dumps(
+            {
+                "moves": moves,
+                "moves_digest": moves_digest,
+                "stacks": ["".join(stack) for stack in stacks],
+            }
+        )
+        # write then rename so a concurrent reader never sees a partial file
+        handle, tmp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(handle, "w", encoding="utf-8") as outfile:
+            outfile.write(payload)
+        os.replace(tmp_path, path)
+        LOG.debug("Saved snapshot after move %d", moves)
+
+    def load(self, moves: int, moves_digest: str) -> Stacks:
+        """
+        Load the stacks of a stored snapshot
+        """
+        with open(self._path(moves, moves_digest), "r", encoding="utf-8") as infile:
+            stored = json.load(infile)
+        return [list(stack) for stack in stored["stacks"]]
+
+
+def hash_moves(moves: Iterable[CrateMove], history: Any) -> Iterator[CrateMove]:
+    """
+    Pass moves through, adding each to a running hash as it is taken
+    moves: moves to pass on
+    history: hashlib object updated with every move
     """
-    for _i in range(num_crates):
-        crate = crates[src - 1].pop()
-        crates[dest - 1].append(crate)
+    for move in moves:
+        history.update(b"%d %d %d\n" % move)
+        yield move
 
 
-def main(fname: str, is_crate_mover_9001: bool) -> None:
+def replay(
+    drawing: Tuple[Stacks, Iterator[CrateMove]],
+    is_crate_mover_9001: bool,
+    snapshot_dir: str,
+    after_move: Optional[int] = None,
+    checkpoint_every: int = 0,
+) -> Dict[str, Any]:
+    """
+    Resume from the latest snapshot of the same moves and apply only the
+    moves after it.
+    drawing: stacks and moves returned by parse
+    is_crate_mover_9001: bool - use CrateMover9001 behavior
+    snapshot_dir: directory holding the snapshots
+    after_move: report the top crates after this many moves rather than
+    after the whole log
+    checkpoint_every: also store a snapshot every this many moves
+    Returns: the top crates and the number of moves applied to reach them
+    """
+    stacks, moves = drawing
+    store = SnapshotStore(snapshot_dir, stacks, is_crate_mover_9001)
+    candidates = {
+        index: digests
+        for index, digests in store.entries().items()
+        if after_move is None or index <= after_move
+    }
+
+    # read up to the last candidate without applying anything, hashing the
+    # moves to find the latest snapshot taken from this same log. Moves read
+    # past that snapshot are kept to be applied from it.
+    history = hashlib.sha256()
+    resume_history = history.copy()
+    resume_at = 0
+    resume_digest = ""
+    unapplied: List[CrateMove] = []
+    read = 0
+    for move in hash_moves(
+        itertools.islice(moves, max(candidates, default=0)), history
+    ):
+        read += 1
+        unapplied.append(move)
+        if read in candidates and history.hexdigest() in candidates[read]:
+            resume_at, resume_digest = read, history.hexdigest()
+            resume_history = history.copy()
+            unapplied.clear()
+    if resume_digest:
+        LOG.debug("Resuming from the snapshot after move %d", resume_at)
+        stacks = store.load(resume_at, resume_digest)
+
+    history = resume_history
+    remaining = hash_moves(itertools.chain(unapplied, moves), history)
+    applied = resume_at
+    while after_move is None or applied < after_move:
+        stop = after_move
+        if checkpoint_every:
+            boundary = (applied // checkpoint_every + 1) * checkpoint_every
+            stop = boundary if stop is None else min(stop, boundary)
+        if stop is None:
+            batch: Iterable[CrateMove] = remaining
+        else:
+            batch = itertools.islice(remaining, stop - applied)
+        applied += apply_moves(stacks, batch, is_crate_mover_9001)
+        if stop is None or applied < stop:
+            break
+        if checkpoint_every and applied % checkpoint_every == 0:
+            store.save(applied, history.hexdigest(), stacks)
+
+    if after_move is not None and applied < after_move:
+        raise ValueError(f"Move {after_move} requested but the log has {applied}")
+    if after_move is None and applied > resume_at:
+        store.save(applied, history.hexdigest(), stacks)
+    LOG.info("Moves applied: %d", applied)
+    return {"result": top_crates(stacks), "moves": applied}
+
+
+def main(fname: str, is_crate_mover_9001: bool) -> Dict[str, str]:
     """
     Main method for implementing the crate mover.
     fname: input filename
     is_crate_mover_9001: bool - use CrateMover9001 behavior
     """
     with open(fname, "r", encoding="utf-8") as infile:
-        lines = infile.readlines()
-        move_lines = []
-        stacks: List[List[str]] = []
-        for index, line in enumerate(lines):
-            new_crates = parse_drawing_line(line)
-            if not new_crates:
-                move_lines = lines[index + 2 :]
-                break
-            for crate in new_crates:
-                label, stack_num = crate
-                for i in range(len(stacks), stack_num, 1):
-                    stacks.append([])
-                stacks[stack_num - 1].append(label)
-        for i, stack in enumerate(stacks):
-            stacks[i] = stack[::-1]
-
-        move_re = re.compile(r"move (\d+) from (\d+) to (\d+)")
-        for index, line in enumerate(move_lines):
-            match = move_re.findall(line.rstrip())
-            if match:
-                print(f"Move {match[0][0]} from {match[0][1]} to {match[0][2]}")
-                num_crates_to_move = int(match[0][0])
-                from_stack = int(match[0][1])
-                to_stack = int(match[0][2])
-                if is_crate_mover_9001:
-                    move_crates_9001(stacks, from_stack, to_stack, num_crates_to_move)
-                else:
-                    move_crates_9000(stacks, from_stack, to_stack, num_crates_to_move)
-        for index, stack in enumerate(stacks):
-            print(f"Top of stack {index+1} is {stack[-1]}")
-        result_str = "".join([stack[-1] for stack in stacks])
-        print(f"Result: {result_str}")
+        with profiling.phase("parse"):
+            parsed = parse(infile)
+        with profiling.phase("solve"):
+            return solve(parsed, is_crate_mover_9001)
+
+
+def replay_main(
+    fname: str,
+    is_crate_mover_9001: bool,
+    snapshot_dir: str,
+    after_move: Optional[int] = None,
+    checkpoint_every: int = 0,
+) -> Dict[str, Any]:
+    """
+    Main method resuming from stored snapshots.
+    fname: input filename
+    is_crate_mover_9001: bool - use CrateMover9001 behavior
+    snapshot_dir: directory holding the snapshots
+    after_move: report the top crates after this many moves
+    checkpoint_every: also store a snapshot every this many moves
+    """
+    with open(fname, "r", encoding="utf-8") as infile:
+        with profiling.phase("parse"):
+            parsed = parse(infile)
+        with profiling.phase("solve"):
+            return replay(
+                parsed, is_crate_mover_9001, snapshot_dir, after_move, checkpoint_every
+            )
 
 
 if __name__ == "__main__":
     parser = ap.ArgumentParser()
     parser.add_argument("filename")
     parser.add_argument("--crate-mover-9001", action="store_true")
+    parser.add_argument(
+        "--snapshot-dir",
+        help="resume from the latest snapshot in this directory, apply only the "
+        "new moves and store a snapshot of the result",
+    )
+    parser.add_argument(
+        "--after-move",
+        type=int,
+        metavar="K",
+        help="with --snapshot-dir, report the top crates after move K, replaying "
+        "from the nearest earlier snapshot",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        default=0,
+        type=int,
+        metavar="N",
+        help="with --snapshot-dir, also store a snapshot every N moves",
+    )
+    log.add_arguments(parser)
+    profiling.add_arguments(parser)
     args = parser.parse_args()
-    main(args.filename, args.crate_mover_9001)
+    if not args.snapshot_dir and (args.after_move is not None or args.checkpoint_every):
+        parser.error("--after-move and --checkpoint-every need --snapshot-dir")
+    log.setup(args.verbose)
+    with profiling.profile(args.profile, args.profile_top):
+        if args.snapshot_dir:
+            replay_main(
+                args.filename,
+                args.crate_mover_9001,
+                args.snapshot_dir,
+                args.after_move,
+                args.checkpoint_every,
+            )
+        else:
+            main(args.filename, args.crate_mover_9001)
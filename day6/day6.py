@@ -1,40 +1,283 @@
 import argparse as ap
-from typing import List
+import os
+import socket
+import sys
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoclib import log, profiling, reader  # pylint: disable=wrong-import-position
 
-def part1_main(line: str) -> None:
-    last_four: List[str] = []
-    for i, c in enumerate(line):
-        last_four.insert(0, c)
-        if len(last_four) > 4:
-            last_four.pop()
-        if len(set(last_four)) == 4:
-            print(f"Data Sync Position found: {i+1}")
-            break
+LOG = log.get_logger(__name__)
 
 
-def part2_main(line: str) -> None:
-    last_fourteen: List[str] = []
-    for i, c in enumerate(line):
-        last_fourteen.insert(0, c)
-        if len(last_fourteen) > 14:
-            last_fourteen.pop()
-        if len(set(last_fourteen)) == 14:
-            print(f"Message Starc Position found: {i+1}")
-            break
+START_OF_PACKET = 4
+START_OF_MESSAGE = 14
 
+# bytes read from a stream at a time
+CHUNK_SIZE = 64 * 1024
 
-def main(fname: str) -> None:
+
+class MarkerFinder:
+    """
+    Find the first position where the last N bytes are all different, for
+    several window sizes in one pass. Rather than keeping each window, it
+    keeps the last position of every byte value and the start of the
+    longest run of distinct bytes ending at the current position; a window
+    of size N is distinct once that run is N long. Each byte costs O(1)
+    whatever the window sizes, and the state does not grow with the data.
+    """
+
+    def __init__(self, window_sizes: Iterable[int], alphabet: int = 256) -> None:
+        """
+        Params:
+            window_sizes: marker lengths to look for
+            alphabet: number of distinct values fed, 256 for bytes
+        """
+        self.pending = sorted(set(window_sizes))
+        self.markers: Dict[int, int] = {}
+        self.last_seen = [-1] * alphabet
+        self.position = 0
+        self.run_start = 0
+
+    @property
+    def done(self) -> bool:
+        """
+        True once every marker has been found
+        """
+        return not self.pending
+
+    def feed(self, data: Iterable[int]) -> List[Tuple[int, int]]:
+        """
+        Scan the next bytes of the stream, stopping once every marker is found
+        Params:
+            data: bytes following those already fed
+        Returns: (window size, position just past the marker) of each marker
+        completed by these bytes
+        """
+        found: List[Tuple[int, int]] = []
+        pending = self.pending
+        last_seen = self.last_seen
+        position = self.position
+        run_start = self.run_start
+        for byte in data:
+            if not pending:
+                break
+            if last_seen[byte] >= run_start:
+                run_start = last_seen[byte] + 1
+            last_seen[byte] = position
+            position += 1
+            while pending and position - run_start >= pending[0]:
+                found.append((pending.pop(0), position))
+        self.position = position
+        self.run_start = run_start
+        self.markers.update(found)
+        return found
+
+
+def find_markers(line: str, window_sizes: Sequence[int]) -> Dict[int, Optional[int]]:
+    """
+    Find the markers of one datastream
+    Params:
+        line: the datastream
+        window_sizes: marker lengths to look for
+    Returns: position just past each marker, or None for a marker not found
+    """
+    if line.isascii():
+        finder = MarkerFinder(window_sizes)
+        finder.feed(line.encode("ascii"))
+    else:
+        # number the characters densely, so positions count characters
+        # rather than UTF-8 bytes
+        codes = {char: code for code, char in enumerate(set(line))}
+        finder = MarkerFinder(window_sizes, len(codes))
+        finder.feed([codes[char] for char in line])
+    return {size: finder.markers.get(size) for size in window_sizes}
+
+
+def log_marker(size: int, position: Optional[int]) -> None:
+    """
+    Log a marker that was found
+    """
+    if position is None:
+        return
+    if size == START_OF_PACKET:
+        LOG.info("Data Sync Position found: %d", position)
+    elif size == START_OF_MESSAGE:
+        LOG.info("Message Starc Position found: %d", position)
+    else:
+        LOG.info("Marker of %d distinct characters found: %d", size, position)
+
+
+def parse(lines: Iterable[str]) -> Iterator[str]:
+    return reader.lines(lines)
+
+
+def solve(lines: Iterable[str], windows: Sequence[int] = ()) -> Dict[str, Any]:
+    """
+    Find the start-of-packet and start-of-message markers of each datastream
+    Params:
+        lines: one datastream per line
+        windows: further marker lengths to look for in the same pass
+    Returns: the marker positions of each line, with the further lengths
+    under "markers"
+    """
+    window_sizes = [START_OF_PACKET, START_OF_MESSAGE]
+    window_sizes.extend(size for size in windows if size not in window_sizes)
+    results: Dict[int, List[Optional[int]]] = {size: [] for size in window_sizes}
+    for line in lines:
+        for size, position in find_markers(line, window_sizes).items():
+            log_marker(size, position)
+            results[size].append(position)
+    solution: Dict[str, Any] = {
+        "start_of_packet": results[START_OF_PACKET],
+        "start_of_message": results[START_OF_MESSAGE],
+    }
+    if windows:
+        solution["markers"] = {str(size): results[size] for size in windows}
+    return solution
+
+
+def main(fname: str, windows: Sequence[int] = ()) -> Dict[str, Any]:
+    if fname == "-":
+        return run(sys.stdin, windows)
     with open(fname, "r", encoding="utf-8") as infile:
-        lines = [line.rstrip("\n") for line in infile.readlines()]
-        for line in lines:
-            part1_main(line)
-            part2_main(line)
+        return run(infile, windows)
+
+
+def run(infile: Iterable[str], windows: Sequence[int]) -> Dict[str, Any]:
+    """
+    Solve an open input
+    """
+    with profiling.phase("parse"):
+        parsed = parse(infile)
+    with profiling.phase("solve"):
+        return solve(parsed, windows)
+
+
+def read_chunks(read: Callable[[int], bytes], chunk_size: int) -> Iterator[bytes]:
+    """
+    Yield the chunks of a byte stream until it ends
+    Params:
+        read: returns up to the given number of bytes, as soon as any are
+        available, and no bytes at the end of the stream
+        chunk_size: most bytes to read at a time
+    Returns: iterator over the chunks, with line breaks removed
+    """
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            return
+        yield chunk.translate(None, b"\r\n")
+
+
+def stream_markers(
+    chunks: Iterable[bytes], window_sizes: Sequence[int]
+) -> Iterator[Tuple[int, int]]:
+    """
+    Find markers in one unbounded datastream as its chunks arrive. Only the
+    current chunk is held, and the stream is read no further once every
+    marker is found.
+    Params:
+        chunks: the datastream in consecutive pieces of any size
+        window_sizes: marker lengths to look for
+    Returns: iterator yielding (window size, position just past the marker)
+    as each marker is found
+    """
+    finder = MarkerFinder(window_sizes)
+    for chunk in chunks:
+        yield from finder.feed(chunk)
+        if finder.done:
+            return
+
+
+def stream_main(
+    source: str,
+    windows: Sequence[int] = (),
+    chunk_size: int = CHUNK_SIZE,
+    socket_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Scan a single datastream as a byte stream, logging each marker as soon
+    as it is found. Line breaks in the stream are ignored.
+    Params:
+        source: input filename, or - to read stdin
+        windows: further marker lengths to look for
+        chunk_size: most bytes to read at a time
+        socket_path: read from the local socket at this path instead
+    Returns: the position of each marker, or None for a marker not found
+    """
+    window_sizes = [START_OF_PACKET, START_OF_MESSAGE]
+    window_sizes.extend(size for size in windows if size not in window_sizes)
+    markers: Dict[int, Optional[int]] = dict.fromkeys(window_sizes)
+
+    def scan(read: Callable[[int], bytes]) -> None:
+        with profiling.phase("solve"):
+            for size, position in stream_markers(
+                read_chunks(read, chunk_size), window_sizes
+            ):
+                log_marker(size, position)
+                markers[size] = position
+
+    if socket_path:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+            scan(sock.recv)
+    elif source == "-":
+        scan(sys.stdin.buffer.read1)
+    else:
+        with open(source, "rb") as infile:
+            scan(infile.read1)
+
+    solution: Dict[str, Any] = {
+        "start_of_packet": markers[START_OF_PACKET],
+        "start_of_message": markers[START_OF_MESSAGE],
+    }
+    if windows:
+        solution["markers"] = {str(size): markers[size] for size in windows}
+    return solution
 
 
 if __name__ == "__main__":
     parser = ap.ArgumentParser()
-    parser.add_argument("filename")
+    parser.add_argument("filename", nargs="?", default="-", help="- reads stdin")
+    parser.add_argument(
+        "--window",
+        action="append",
+        default=[],
+        type=int,
+        metavar="N",
+        help="also find the first N distinct characters (repeatable)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="scan the input as one unbounded byte stream, logging each marker "
+        "as soon as it is found",
+    )
+    parser.add_argument(
+        "--socket", metavar="PATH", help="stream from the local socket at PATH"
+    )
+    parser.add_argument("--chunk-size", default=CHUNK_SIZE, type=int)
+    log.add_arguments(parser)
+    profiling.add_arguments(parser)
     args = parser.parse_args()
-
-    main(args.filename)
+    if any(size < 1 for size in args.window):
+        parser.error("--window must be at least 1")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+    log.setup(args.verbose)
+    with profiling.profile(args.profile, args.profile_top):
+        if args.stream or args.socket:
+            stream_main(args.filename, args.window, args.chunk_size, args.socket)
+        else:
+            main(args.filename, args.window)
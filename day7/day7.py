@@ -2,9 +2,19 @@
 This module processes the Day 7 Advent of Code challenge.
 """
 import argparse as ap
-from typing import Tuple, List, Dict, Optional
+import bisect
+import itertools
+import os
+import sys
+from array import array
+from typing import Any, List, Dict, Iterable, Iterator, Optional, Sequence, Tuple
 from dataclasses import dataclass
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoclib import log, profiling, reader  # pylint: disable=wrong-import-position
+
+LOG = log.get_logger(__name__)
+
 
 @dataclass
 class FileNode:
@@ -28,7 +38,10 @@ class FileNode:
 class DirectoryNode:
     """
     File tree directory node abstraction
-    Has no intrinsic size but contains other files and directories
+    Has no intrinsic size but contains other files and directories. The
+    recursive size is cached, so reading it is O(1). It is kept up to date
+    as files are added, or, when a whole log is replayed, built once at the
+    end by recompute_sizes, which avoids walking up a deep tree per file.
     """
 
     def __init__(self, name: str, parent: Optional["DirectoryNode"]) -> None:
@@ -46,39 +59,105 @@ class DirectoryNode:
         self.directories[".."] = parent
         self.cd_directories: Dict[str, DirectoryNode] = {}
         self.files: List[FileNode] = []
+        self.total_size = 0
 
     def walk_dirs(self) -> List["DirectoryNode"]:
         """
         walk_dirs returns all subdirectories recursively
         Params:
             self
-        Returns: list of all subdirectories
+        Returns: list of all subdirectories, in pre-order
+        """
+        return list(itertools.islice(self.iter_preorder(), 1, None))
+
+    def iter_preorder(self) -> Iterator["DirectoryNode"]:
+        """
+        Yield this directory and then every directory below it, each before
+        its subdirectories. An explicit stack replaces recursion, so trees
+        of any depth can be walked.
+        Params: self
+        Returns: iterator over the directories
+        """
+        yield self
+        stack = [iter(self.cd_directories.values())]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                continue
+            yield child
+            stack.append(iter(child.cd_directories.values()))
+
+    def iter_postorder(self) -> Iterator["DirectoryNode"]:
+        """
+        Yield every directory below this one and then this directory, each
+        after its subdirectories, without recursion
+        Params: self
+        Returns: iterator over the directories
         """
-        all_dirs: List[DirectoryNode] = []
-        for my_dir in self.cd_directories.values():
-            all_dirs.append(my_dir)
-            all_dirs.extend(my_dir.walk_dirs())
-        return all_dirs
+        stack = [(self, iter(self.cd_directories.values()))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                yield node
+            else:
+                stack.append((child, iter(child.cd_directories.values())))
 
-    def add_directory(self, dirname: str) -> None:
+    def recompute_sizes(self) -> None:
+        """
+        Rebuild the recursive size of this directory and every directory
+        below it from their files, in one post-order pass
+        Params: self
+        Returns: None
+        """
+        for node in self.iter_postorder():
+            node.total_size = sum(f.size() for f in node.files) + sum(
+                d.total_size for d in node.cd_directories.values()
+            )
+
+    def add_directory(self, dirname: str, propagate: bool = True) -> None:
         """
         Append a directory object to this directory
         Params:
             dirname: name of the directory
+            propagate: update the cached sizes above, False when
+            recompute_sizes runs afterwards
         Returns: None
         """
+        replaced = self.cd_directories.get(dirname)
+        if replaced is not None and propagate:
+            # the old directory and everything below it leave the tree
+            self.propagate_size(-replaced.total_size)
         self.cd_directories[dirname] = DirectoryNode(dirname, self)
         self.directories[dirname] = self.cd_directories[dirname]
 
-    def add_file(self, fname: str, f_sz: int) -> None:
+    def add_file(self, fname: str, f_sz: int, propagate: bool = True) -> None:
         """
         Append a file object to this directory
         Params:
             fname: name of file
             sz: size of the file
+            propagate: update the cached sizes above, False when
+            recompute_sizes runs afterwards
         Returns: None
         """
         self.files.append(FileNode(fname, f_sz))
+        if propagate:
+            self.propagate_size(f_sz)
+
+    def propagate_size(self, delta: int) -> None:
+        """
+        Apply a change in size to this directory and every directory above it
+        Params:
+            delta: bytes added, or removed if negative
+        Returns: None
+        """
+        node: Optional[DirectoryNode] = self
+        while node is not None:
+            node.total_size += delta
+            node = node.parent
 
     def size(self) -> int:
         """
@@ -86,12 +165,193 @@ class DirectoryNode:
         Params: self
         Returns: size as integer
         """
-        return sum(d.size() for d in list(self.cd_directories.values()) + self.files)
+        return self.total_size
 
     def __repr__(self) -> str:
         return f"DIR {self.name}"
 
 
+class CompactTree:
+    """
+    File tree held in parallel arrays rather than one object per node, for
+    logs with millions of entries. A directory is an index into the arrays
+    of parents and recursive sizes, and its name is a slice of one shared
+    byte buffer. Children are found through one dict keyed on a hash of
+    parent and name, checked against the arrays on lookup. Files only add
+    their size to the directories above them. The root is index 0, and a
+    directory is always stored after its parent. Listing a directory again
+    bumps its generation, which drops the children stored with the old one.
+    """
+
+    ROOT = 0
+    # parent of the root
+    NO_PARENT = -1
+
+    def __init__(self) -> None:
+        self.parents = array("q", [self.NO_PARENT])
+        self.sizes = array("q", [0])
+        self.generations = array("I", [0])
+        # generation of the parent when each directory was added to it
+        self.parent_generations = array("I", [0])
+        self.name_buffer = bytearray(b"/")
+        self.name_offsets = array("q", [0, 1])
+        self.children: Dict[int, int] = {}
+        # children whose key hash collides with another child's
+        self.colliding: Dict[Tuple[int, str], int] = {}
+
+    def name(self, node: int) -> str:
+        """
+        Name of a directory
+        """
+        offsets = self.name_offsets
+        return self.name_buffer[offsets[node] : offsets[node + 1]].decode()
+
+    def size(self, node: int) -> int:
+        """
+        Recursive size of a directory
+        """
+        return self.sizes[node]
+
+    def is_child(self, child: int, node: int) -> bool:
+        """
+        Whether a directory is still listed in another
+        """
+        return (
+            self.parents[child] == node
+            and self.parent_generations[child] == self.generations[node]
+        )
+
+    def find_child(self, node: int, dirname: str) -> Optional[int]:
+        """
+        Look up a directory listed in another
+        Params:
+            node: parent directory
+            dirname: name of the directory
+        Returns: the directory, or None if it was never listed
+        """
+        child = self.children.get(hash((node, dirname)))
+        if child is None:
+            return None
+        if self.is_child(child, node) and self.name(child) == dirname:
+            return child
+        child = self.colliding.get((node, dirname))
+        if child is not None and self.is_child(child, node):
+            return child
+        return None
+
+    def add_directory(self, node: int, dirname: str, propagate: bool = True) -> None:
+        """
+        Add an empty directory, replacing any directory of the same name
+        Params:
+            node: directory being listed
+            dirname: name of the directory
+            propagate: update the sizes above, False when accumulate_sizes
+            runs afterwards
+        Returns: None
+        """
+        replaced = self.find_child(node, dirname)
+        if replaced is not None:
+            # empty the directory in place, so it keeps its position among
+            # its siblings as a replaced dict entry does in DirectoryNode
+            if propagate:
+                self.add_size(node, -self.sizes[replaced])
+            self.sizes[replaced] = 0
+            self.generations[replaced] += 1
+            return
+
+        child = len(self.parents)
+        self.parents.append(node)
+        self.sizes.append(0)
+        self.generations.append(0)
+        self.parent_generations.append(self.generations[node])
+        self.name_buffer += dirname.encode()
+        self.name_offsets.append(len(self.name_buffer))
+
+        key = hash((node, dirname))
+        listed = self.children.get(key)
+        if listed is None or not self.is_child(listed, node):
+            self.children[key] = child
+        else:
+            self.colliding[(node, dirname)] = child
+
+    def add_file(self, node: int, f_sz: int, propagate: bool = True) -> None:
+        """
+        Add a file's size to its directory and every directory above it, or
+        to its directory alone when propagate is False
+        """
+        if propagate:
+            self.add_size(node, f_sz)
+        else:
+            self.sizes[node] += f_sz
+
+    def accumulate_sizes(self) -> None:
+        """
+        Turn the size of each directory's own files, as added with
+        propagate False, into its recursive size. Children are stored after
+        their parents, so one pass from the last directory back to the root
+        adds every directory into its parent after its own children.
+        """
+        parents = self.parents
+        sizes = self.sizes
+        for node in range(len(parents) - 1, self.ROOT, -1):
+            if self.is_child(node, parents[node]):
+                sizes[parents[node]] += sizes[node]
+
+    def add_size(self, node: int, delta: int) -> None:
+        """
+        Apply a change in size to a directory and every directory above it
+        """
+        while node >= 0:
+            self.sizes[node] += delta
+            node = self.parents[node]
+
+    def change_directory(self, node: int, newdir: str) -> Optional[int]:
+        """
+        Follow a cd the way DirectoryNode does
+        Params:
+            node: current directory
+            newdir: name of new directory
+        Returns: the directory switched into, None for the parent of the root
+        """
+        if newdir == ".":
+            return node
+        if newdir == "..":
+            parent = self.parents[node]
+            return parent if parent >= 0 else None
+        child = self.find_child(node, newdir)
+        if child is not None:
+            return child
+        if newdir == self.name(node):
+            return node
+        raise KeyError(newdir)
+
+    def directories(self) -> Iterator[int]:
+        """
+        Yield every directory below the root in pre-order and then the root,
+        the order DirectoryNode.walk_dirs gives, so ties between equal sizes
+        are settled the same way. Dropped directories are skipped.
+        """
+        # link each directory's children in creation order, which is the
+        # order they were listed in
+        first_child = array("q", [-1]) * len(self.parents)
+        next_sibling = array("q", [-1]) * len(self.parents)
+        for node in range(len(self.parents) - 1, self.ROOT, -1):
+            parent = self.parents[node]
+            if self.is_child(node, parent):
+                next_sibling[node] = first_child[parent]
+                first_child[parent] = node
+
+        stack = [first_child[self.ROOT]]
+        while stack:
+            node = stack.pop()
+            if node < 0:
+                continue
+            yield node
+            stack.append(next_sibling[node])
+            stack.append(first_child[node])
+        yield self.ROOT
+
+
 def change_directory(dnode: DirectoryNode, newdir: str) -> Optional[DirectoryNode]:
     """
     Process change directory command on the current directory
@@ -100,7 +360,7 @@ def change_directory(dnode: DirectoryNode, newdir: str) -> Optional[DirectoryNod
         newdir: name of new directory
     Returns: Optional[DirectoryNode] - Directory object switched into
     """
-    print(f"Process change_directory from {dnode.name} to {newdir}")
+    LOG.debug("Process change_directory from %s to %s", dnode.name, newdir)
     if newdir == ".":
         return dnode
     if newdir == "..":
@@ -109,104 +369,347 @@ def change_directory(dnode: DirectoryNode, newdir: str) -> Optional[DirectoryNod
     return dnode.directories[newdir]
 
 
-def process_ls(
-    current_directory: DirectoryNode, lines: List[str], current_line: int
-) -> int:
+def process_ls_entry(
+    current_directory: DirectoryNode, fields: List[str], debug: bool
+) -> None:
     """
-    Process ls command on the current directory
+    Record one line of ls output in the current directory
     Params:
         current_directory: active directory object
-        lines: List of strings in the input file
-        current_line: index of the line currently under process
-    Returns:
-        the next line index to process
+        fields: the output line split on spaces
+        debug: log each entry added
     """
-    print(f"Process ls for {current_directory.name}")
-    current_line += 1
-    while current_line < len(lines):
-        line = lines[current_line]
-        fields = line.split(" ")
-        if fields[0] == "$":
-            return current_line
-        if fields[0] == "dir":
-            print(f"Add directory {fields[1]}")
-            current_directory.add_directory(fields[1])
-        else:
-            print(f"Add file {fields[1]} {fields[0]}")
-            current_directory.add_file(fields[1], int(fields[0]))
-        current_line += 1
-    return current_line
+    if fields[0] == "dir":
+        if debug:
+            LOG.debug("Add directory %s", fields[1])
+        current_directory.add_directory(fields[1], propagate=False)
+    else:
+        if debug:
+            LOG.debug("Add file %s %s", fields[1], fields[0])
+        current_directory.add_file(fields[1], int(fields[0]), propagate=False)
 
 
 def process_command(
-    current_directory: Optional[DirectoryNode], lines: List[str], current_line: int
-) -> Tuple[int, Optional[DirectoryNode]]:
+    current_directory: Optional[DirectoryNode], fields: List[str], debug: bool
+) -> Optional[DirectoryNode]:
     """
-    Process the next command from the input stream
+    Process a command line from the input stream. The output of ls follows
+    on the next lines.
     Params:
         current_directory: Directory object where the user is
-        lines: All command lines in the input file
-        current_line: Index of the command line currently under process
+        fields: the command line split on spaces
+        debug: log the command
     Returns:
-        Tuple[The next line to process, The new directory object]
+        The new directory object
     """
     assert current_directory is not None
-
-    line = lines[current_line]
-    fields = line.split(" ")
     assert fields[0] == "$"
     if fields[1] == "cd":
-        current_directory = change_directory(current_directory, fields[2])
-        return current_line + 1, current_directory
+        return change_directory(current_directory, fields[2])
     assert fields[1] == "ls"
-    next_line = process_ls(current_directory, lines, current_line)
-    return next_line, current_directory
+    if debug:
+        LOG.debug("Process ls for %s", current_directory.name)
+    return current_directory
+
+
+def parse(lines: Iterable[str]) -> DirectoryNode:
+    """
+    Replay a file system command input and output stream one line at a time
+    Params:
+        lines: input lines
+    Returns: root directory of the reconstructed tree
+    """
+    root_directory: Optional[DirectoryNode] = DirectoryNode("/", None)
+    current_directory = root_directory
+    debug = LOG.isEnabledFor(log.DEBUG)
+
+    for line in reader.lines(lines):
+        fields = line.split(" ")
+        if fields[0] == "$":
+            current_directory = process_command(current_directory, fields, debug)
+        else:
+            assert current_directory is not None
+            process_ls_entry(current_directory, fields, debug)
+
+    assert root_directory is not None
+    # sizes are summed once here rather than up the tree for every file
+    root_directory.recompute_sizes()
+    return root_directory
+
+
+def parse_compact(lines: Iterable[str]) -> CompactTree:
+    """
+    Replay a file system command input and output stream into a CompactTree
+    Params:
+        lines: input lines
+    Returns: the reconstructed tree
+    """
+    tree = CompactTree()
+    current_directory: Optional[int] = CompactTree.ROOT
+    debug = LOG.isEnabledFor(log.DEBUG)
+
+    for line in reader.lines(lines):
+        fields = line.split(" ")
+        assert current_directory is not None
+        if fields[0] == "$":
+            if fields[1] == "cd":
+                if debug:
+                    LOG.debug(
+                        "Process change_directory from %s to %s",
+                        tree.name(current_directory),
+                        fields[2],
+                    )
+                current_directory = tree.change_directory(current_directory, fields[2])
+            else:
+                assert fields[1] == "ls"
+        elif fields[0] == "dir":
+            if debug:
+                LOG.debug("Add directory %s", fields[1])
+            tree.add_directory(current_directory, fields[1], propagate=False)
+        else:
+            if debug:
+                LOG.debug("Add file %s %s", fields[1], fields[0])
+            tree.add_file(current_directory, int(fields[0]), propagate=False)
+    tree.accumulate_sizes()
+    return tree
+
+
+# puzzle defaults for the disk and the space the update needs
+DISK_CAPACITY = 70000000
+REQUIRED_SPACE = 30000000
+# directories below this size count towards part 1
+SMALL_DIR_LIMIT = 100000
+
+SpaceQuery = Tuple[int, int]
+
+
+class SizeIndex:
+    """
+    Directory sizes sorted once after parsing, with prefix sums, so the
+    total of the directories below a size and the smallest directory of at
+    least a size are binary searches rather than scans
+    """
+
+    def __init__(self, dir_sizes: Iterable[Tuple[str, int]]) -> None:
+        """
+        Params:
+            dir_sizes: name and recursive size of each directory
+        """
+        # a stable sort keeps the earlier directory first among equal sizes
+        ordered = sorted(dir_sizes, key=lambda entry: entry[1])
+        self.names = [name for name, _size in ordered]
+        self.sizes = [size for _name, size in ordered]
+        self.prefix_sums = list(itertools.accumulate(self.sizes, initial=0))
+
+    def total_below(self, limit: int) -> int:
+        """
+        Total size of the directories smaller than limit
+        """
+        return self.prefix_sums[bisect.bisect_left(self.sizes, limit)]
+
+    def smallest_at_least(self, needed: int) -> Optional[Tuple[str, int]]:
+        """
+        Find the smallest directory of at least a size
+        Params:
+            needed: minimum size
+        Returns: name and size of the directory, None if every directory is
+        smaller. Among equal sizes the earliest directory is chosen.
+        """
+        position = bisect.bisect_left(self.sizes, needed)
+        if position == len(self.sizes):
+            return None
+        return self.names[position], self.sizes[position]
+
+
+def choose_directory(
+    index: SizeIndex, root_size: int, capacity: int, required: int
+) -> Dict[str, Any]:
+    """
+    Pick the smallest directory whose deletion frees enough space
+    Params:
+        index: sizes of every directory
+        root_size: recursive size of the root directory
+        capacity: disk size
+        required: free space needed
+    Returns: the directory chosen, or "" and -1 if no deletion is needed
+    or none frees enough
+    """
+    best_size = -1
+    best_dir: str = ""
+    unused_space = capacity - root_size
+    if unused_space < required:
+        needed_space = required - unused_space
+        LOG.info("Unused: %d needed %d", unused_space, needed_space)
+        best = index.smallest_at_least(needed_space)
+        if best is not None:
+            best_dir, best_size = best
+        LOG.info("Best dir: %s needed %d has %d", best_dir, needed_space, best_size)
+    return {"best_dir": best_dir, "best_size": best_size}
 
 
-def main(fname: str) -> None:
+def report(
+    dir_sizes: List[Tuple[str, int]],
+    root_size: int,
+    capacity: int = DISK_CAPACITY,
+    required: int = REQUIRED_SPACE,
+    what_if: Sequence[SpaceQuery] = (),
+) -> Dict[str, Any]:
+    """
+    Solve both parts from the size of every directory
+    Params:
+        dir_sizes: name and recursive size of each directory
+        root_size: recursive size of the root directory
+        capacity: disk size
+        required: free space needed
+        what_if: further (capacity, required) pairs to answer from the same
+        index
+    Returns: part 1 total and the directory chosen for part 2, and for each
+    what_if pair under "what_if"
+    """
+    if LOG.isEnabledFor(log.DEBUG):
+        for name, size in dir_sizes:
+            LOG.debug("f_dir DIR %s", name)
+            LOG.debug("DIR %s: Sz %d", name, size)
+    index = SizeIndex(dir_sizes)
+    total = index.total_below(SMALL_DIR_LIMIT)
+    LOG.info("Part1 Total %d", total)
+
+    result = {"part1": total, **choose_directory(index, root_size, capacity, required)}
+    if what_if:
+        result["what_if"] = []
+        for query_capacity, query_required in what_if:
+            LOG.info("Capacity %d required %d", query_capacity, query_required)
+            choice = choose_directory(index, root_size, query_capacity, query_required)
+            result["what_if"].append(
+                {"capacity": query_capacity, "required": query_required, **choice}
+            )
+    return result
+
+
+def solve(
+    root_directory: DirectoryNode,
+    capacity: int = DISK_CAPACITY,
+    required: int = REQUIRED_SPACE,
+    what_if: Sequence[SpaceQuery] = (),
+) -> Dict[str, Any]:
+    """
+    Solve both parts from the reconstructed directory tree
+    Params:
+        root_directory: root of the tree returned by parse
+        capacity: disk size
+        required: free space needed
+        what_if: further (capacity, required) pairs to answer
+    Returns: part 1 total and the directory chosen for part 2
+    """
+    all_dirs = root_directory.walk_dirs() + [root_directory]
+    dir_sizes = [(f_dir.name, f_dir.size()) for f_dir in all_dirs]
+    return report(dir_sizes, root_directory.size(), capacity, required, what_if)
+
+
+def solve_compact(
+    tree: CompactTree,
+    capacity: int = DISK_CAPACITY,
+    required: int = REQUIRED_SPACE,
+    what_if: Sequence[SpaceQuery] = (),
+) -> Dict[str, Any]:
+    """
+    Solve both parts from a CompactTree
+    Params:
+        tree: tree returned by parse_compact
+        capacity: disk size
+        required: free space needed
+        what_if: further (capacity, required) pairs to answer
+    Returns: part 1 total and the directory chosen for part 2
+    """
+    dir_sizes = [(tree.name(node), tree.size(node)) for node in tree.directories()]
+    return report(dir_sizes, tree.size(CompactTree.ROOT), capacity, required, what_if)
+
+
+def main(
+    fname: str,
+    use_mmap: bool = False,
+    compact: bool = False,
+    capacity: int = DISK_CAPACITY,
+    required: int = REQUIRED_SPACE,
+    what_if: Sequence[SpaceQuery] = (),
+) -> Dict[str, Any]:
     """
     Main function for processing a file system command input and output stream
     Params:
         fname: Input file
+        use_mmap: decode lines one at a time from a memory map of the file
+        compact: hold the tree in a CompactTree
+        capacity: disk size
+        required: free space needed
+        what_if: further (capacity, required) pairs to answer
     """
+    if use_mmap:
+        with reader.MappedInput(fname) as mapped:
+            return run(mapped.text_lines(), compact, capacity, required, what_if)
     with open(fname, "r", encoding="utf-8") as infile:
-        lines = [line.rstrip("\n") for line in infile.readlines()]
-        current_line = 0
-        root_directory: Optional[DirectoryNode] = DirectoryNode("/", None)
-        current_directory = root_directory
-
-        while current_line < len(lines):
-            current_line, current_directory = process_command(
-                current_directory, lines, current_line
-            )
+        return run(infile, compact, capacity, required, what_if)
+
+
+def run(
+    lines: Iterable[str],
+    compact: bool,
+    capacity: int,
+    required: int,
+    what_if: Sequence[SpaceQuery],
+) -> Dict[str, Any]:
+    """
+    Solve an open input
+    """
+    if compact:
+        with profiling.phase("parse"):
+            tree = parse_compact(lines)
+        with profiling.phase("solve"):
+            return solve_compact(tree, capacity, required, what_if)
+    with profiling.phase("parse"):
+        parsed = parse(lines)
+    with profiling.phase("solve"):
+        return solve(parsed, capacity, required, what_if)
+
 
-        assert root_directory is not None
-        all_dirs = root_directory.walk_dirs() + [root_directory]
-
-        total = 0
-        for f_dir in all_dirs:
-            print(f"f_dir {f_dir}")
-            if f_dir.size() < 100000:
-                total += f_dir.size()
-            print(f"DIR {f_dir.name}: Sz {f_dir.size()}")
-        print(f"Part1 Total {total}")
-
-        unused_space = 70000000 - root_directory.size()
-        if unused_space < 30000000:
-            needed_space = 30000000 - unused_space
-            print(f"Unused: {unused_space} needed {needed_space}")
-            best_size = -1
-            best_dir: str = ""
-            for f_dir in all_dirs:
-                if f_dir.size() >= needed_space:
-                    if best_size == -1 or f_dir.size() < best_size:
-                        best_dir = f_dir.name
-                        best_size = f_dir.size()
-            print(f"Best dir: {best_dir} needed {needed_space} has {best_size}")
+def space_query(text: str) -> SpaceQuery:
+    """
+    Read a CAPACITY:REQUIRED pair from the command line
+    """
+    capacity, _sep, required = text.partition(":")
+    return int(capacity), int(required)
 
 
 if __name__ == "__main__":
     parser = ap.ArgumentParser()
     parser.add_argument("filename")
+    parser.add_argument(
+        "--mmap", action="store_true", help="memory map the input instead of reading it"
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="hold the tree in parallel arrays, for logs with millions of entries",
+    )
+    parser.add_argument("--capacity", default=DISK_CAPACITY, type=int)
+    parser.add_argument("--required", default=REQUIRED_SPACE, type=int)
+    parser.add_argument(
+        "--what-if",
+        action="append",
+        default=[],
+        type=space_query,
+        metavar="CAPACITY:REQUIRED",
+        help="also pick the directory to delete for this disk (repeatable)",
+    )
+    log.add_arguments(parser)
+    profiling.add_arguments(parser)
     args = parser.parse_args()
-    main(args.filename)
+    log.setup(args.verbose)
+    with profiling.profile(args.profile, args.profile_top):
+        main(
+            args.filename,
+            args.mmap,
+            args.compact,
+            args.capacity,
+            args.required,
+            args.what_if,
+        )
@@ -2,51 +2,62 @@
 Advent of Code 2022 Day 8 Solution
 """
 import argparse as ap
+import os
+import sys
 from functools import reduce
-from typing import List, Tuple, Set
+from typing import Dict, Iterable, List, Sequence, Tuple, Set
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoclib import log, profiling, reader  # pylint: disable=wrong-import-position
 
-def get_visible_positions(lines: List[str], visible: Set[Tuple[int, int]]) -> None:
+LOG = log.get_logger(__name__)
+
+# rows of tree heights as character codes, either bytes or rows indexed
+# straight from a memory mapped input
+Forest = Sequence[Sequence[int]]
+
+
+def get_visible_positions(lines: Forest, visible: Set[Tuple[int, int]]) -> None:
     """
     Find all positions visible from the edges
     Params:
-        lines: list of strings defining tree heights
+        lines: rows of tree heights
         visible:
     Returns: None
     """
     for row, line in enumerate(lines):
         highest_so_far = ord("0") - 1
         for col, char in enumerate(line):
-            if ord(char) > highest_so_far:
+            if char > highest_so_far:
                 visible.add((row, col))
-                highest_so_far = ord(char)
+                highest_so_far = char
 
         highest_so_far = ord("0") - 1
         for col in range(len(line) - 1, -1, -1):
-            if ord(line[col]) > highest_so_far:
+            if line[col] > highest_so_far:
                 visible.add((row, col))
-                highest_so_far = ord(line[col])
+                highest_so_far = line[col]
     for col in range(len(lines[0])):
         highest_so_far = ord("0") - 1
         for row, line in enumerate(lines):
-            if ord(line[col]) > highest_so_far:
+            if line[col] > highest_so_far:
                 visible.add((row, col))
-                highest_so_far = ord(line[col])
+                highest_so_far = line[col]
         highest_so_far = ord("0") - 1
         for row in range(len(lines) - 1, -1, -1):
-            if ord(lines[row][col]) > highest_so_far:
+            if lines[row][col] > highest_so_far:
                 visible.add((row, col))
-                highest_so_far = ord(lines[row][col])
+                highest_so_far = lines[row][col]
 
 
 def get_visible_positions_from_tree(
-    lines: List[str], src_row: int, src_col: int
+    lines: Forest, src_row: int, src_col: int
 ) -> Tuple[int, int, int, int]:
     """
     Find all trees visible in each direction from a given
     source tree.
     Params:
-        list: list of strings defining the forest
+        lines: rows of tree heights
         src_row: row number of the source tree
         src_col: col number of the source tree
     Returns:
@@ -86,30 +97,71 @@ def get_visible_positions_from_tree(
     return (num_up, num_down, num_left, num_right)
 
 
-def main(fname: str) -> None:
+def parse(lines: Iterable[str]) -> List[bytes]:
+    """
+    Read the forest height map
+    Params:
+        lines: input lines
+    Returns: rows of tree heights
+    """
+    return [line.encode() for line in reader.lines(lines)]
+
+
+def solve(forest: Forest) -> Dict[str, int]:
+    """
+    Count the trees visible from outside the forest and find the best
+    scenic score
+    Params:
+        forest: rows of tree heights
+    Returns: visible tree count and best scenic score
+    """
+    visible_positions: Set[Tuple[int, int]] = set()
+    get_visible_positions(forest, visible_positions)
+    LOG.info("Num Visible Trees: %d", len(visible_positions))
+    LOG.debug("%s", log.lazy(sorted, visible_positions))
+
+    all_beauty = [
+        reduce(lambda x, y: x * y, get_visible_positions_from_tree(forest, i, j))
+        for j in range(len(forest[0]))
+        for i in range(len(forest))
+    ]
+    LOG.info("Best Value %d", max(all_beauty))
+    return {"visible": len(visible_positions), "best_score": max(all_beauty)}
+
+
+def main(fname: str, use_mmap: bool = False) -> Dict[str, int]:
     """
     Main function for the AOC 2022 solution
     Params:
         fname: filename of input text
-    Returns: None
+        use_mmap: index the rows straight from a memory map of the file
+    Returns: visible tree count and best scenic score
     """
+    if use_mmap:
+        with reader.MappedInput(fname) as mapped:
+            with profiling.phase("parse"):
+                parsed = list(mapped.lines())
+            with profiling.phase("solve"):
+                result = solve(parsed)
+            # the rows are views of the mapping, which cannot close under them
+            del parsed
+        return result
     with open(fname, "r", encoding="utf-8") as infile:
-        lines = [line.rstrip("\n") for line in infile.readlines()]
-        visible_positions: Set[Tuple[int, int]] = set()
-        get_visible_positions(lines, visible_positions)
-        print(f"Num Visible Trees: {len(visible_positions)}")
-        print(sorted(visible_positions))
-
-        all_beauty = [
-            reduce(lambda x, y: x * y, get_visible_positions_from_tree(lines, i, j))
-            for j in range(len(lines[0]))
-            for i in range(len(lines))
-        ]
-        print(f"Best Value {max(all_beauty)}")
+        with profiling.phase("parse"):
+            parsed = parse(infile)
+        with profiling.phase("solve"):
+            return solve(parsed)
 
 
 if __name__ == "__main__":
     parser = ap.ArgumentParser()
     parser.add_argument("filename")
+    parser.add_argument(
+        "--mmap", action="store_true", help="memory map the input instead of reading it"
+    )
+    log.add_arguments(parser)
+    profiling.add_arguments(parser)
     args = parser.parse_args()
-    main(args.filename)
+    log.setup(args.verbose)
+    with profiling.profile(args.profile, args.profile_top):
+        main(args.filename, args.mmap)
@@ -2,7 +2,14 @@
 Python solution for Advent of Code 2022 Day 9
 """
 import argparse
-from typing import List, Set, Tuple, NamedTuple
+import os
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple, NamedTuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aoclib import log, profiling  # pylint: disable=wrong-import-position
+
+LOG = log.get_logger(__name__)
 
 
 class Move(NamedTuple):
@@ -102,37 +109,63 @@ def process_move(
     return new_positions
 
 
-def main(fname: str, num_knots: int) -> None:
+def parse(lines: Iterable[str]) -> Iterator[Move]:
     """
-    Process parts 1 and 2
+    Convert the input lines into Move objects
     Params:
-        fname: str - filename
+        lines: input lines
+    Returns: iterator over the moves
+    """
+    return (make_move(line.rstrip()) for line in lines)
+
+
+def solve(moves: Iterable[Move], num_knots: int) -> Dict[str, Any]:
+    """
+    Drag a rope with num_knots knots through every move
+    Params:
+        moves: moves in input order
         num_knots: int - number of knots in the rope - 2 for p1, 10 for p2
-    Returns: None
+    Returns: number of cells visited by each knot and by the tail
     """
-    with open(fname, "r", encoding="utf-8") as infile:
-        lines = [line.rstrip() for line in infile.readlines()]
-        moves: List[Move] = []
-        for line in lines:
-            moves.append(make_move(line))
-        visited: List[Set[Tuple[int, int]]] = []
+    visited: List[Set[Tuple[int, int]]] = []
 
-        positions: List[Tuple[int, int]] = []
-        for _i in range(num_knots):
-            visited.append(set())
-            positions.append((0, 0))
+    positions: List[Tuple[int, int]] = []
+    for _i in range(num_knots):
+        visited.append(set())
+        positions.append((0, 0))
 
-        for move in moves:
-            positions = process_move(move, positions, visited)
+    for move in moves:
+        positions = process_move(move, positions, visited)
 
-        for i in range(num_knots):
-            print(f"Knot {i} Num cells visited: {len(visited[i])}")
-        # print(f"Cells visited: {visited}")
+    for i in range(num_knots):
+        LOG.info("Knot %d Num cells visited: %d", i, len(visited[i]))
+    # print(f"Cells visited: {visited}")
+    counts = [len(knot_visited) for knot_visited in visited]
+    return {"visited": counts, "tail_visited": counts[-1]}
+
+
+def main(fname: str, num_knots: int) -> Dict[str, Any]:
+    """
+    Process parts 1 and 2
+    Params:
+        fname: str - filename
+        num_knots: int - number of knots in the rope - 2 for p1, 10 for p2
+    Returns: number of cells visited by each knot and by the tail
+    """
+    with open(fname, "r", encoding="utf-8") as infile:
+        with profiling.phase("parse"):
+            parsed = parse(infile)
+        with profiling.phase("solve"):
+            return solve(parsed, num_knots)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("filename")
     parser.add_argument("--num-knots", default=2, type=int)
+    log.add_arguments(parser)
+    profiling.add_arguments(parser)
     args = parser.parse_args()
-    main(args.filename, args.num_knots)
+    log.setup(args.verbose)
+    with profiling.profile(args.profile, args.profile_top):
+        main(args.filename, args.num_knots)